@@ -5,6 +5,7 @@ Main entry point
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -29,7 +30,7 @@ from src.processors.pdf_generator import PDFGenerator
 from src.database import SupabaseClient
 from src.utils.logger import setup_logger
 from src.utils.email_sender import EmailSender
-import pytz
+from zoneinfo import ZoneInfo
 
 # Setup logger
 logger = setup_logger('blockchain_daily', log_dir='logs')
@@ -42,7 +43,7 @@ def main():
         logger.info("=" * 80)
 
         # Get current time
-        tz = pytz.timezone(TIMEZONE)
+        tz = ZoneInfo(TIMEZONE)
         now = datetime.now(tz)
         date_str = now.strftime('%Y-%m-%d')
 
@@ -67,11 +68,17 @@ def main():
         if NEWS_SOURCES['theblock']['enabled']:
             scrapers.append(('The Block', TheBlockScraper()))
 
-        # Fetch from all sources
-        for source_name, scraper in scrapers:
-            news = scraper.fetch_news(hours=FETCH_HOURS)
-            logger.info(f"  {source_name}: {len(news)} items")
-            all_news.extend(news)
+        # All sources share the same time window
+        for _, scraper in scrapers:
+            scraper.bind_run(now)
+
+        # Fetch from all sources concurrently (network-bound, each scraper handles its own errors)
+        with ThreadPoolExecutor(max_workers=max(1, len(scrapers))) as executor:
+            results = executor.map(lambda item: item[1].fetch_news(hours=FETCH_HOURS), scrapers)
+            # Results keep the source order
+            for (source_name, _), news in zip(scrapers, results):
+                logger.info(f"  {source_name}: {len(news)} items")
+                all_news.extend(news)
 
         logger.info(f"Total fetched: {len(all_news)} news items")
 
@@ -193,16 +200,16 @@ def main():
         if ENABLE_EMAIL_SEND and pdf_path:
             logger.info("\n[Step 7/8] Sending email with PDF and images zip...")
             try:
-                email_sender = EmailSender()
-                success = email_sender.send_daily_report(
-                    pdf_path=pdf_path,
-                    date_str=date_str,
-                    article_title=processed_data['title'],
-                    article_description=processed_data['description'],
-                    num_news=len(all_news),
-                    num_images=len(generated_images),
-                    images_dir='output/images'  # Pass images directory
-                )
+                with EmailSender() as email_sender:
+                    success = email_sender.send_daily_report(
+                        pdf_path=pdf_path,
+                        date_str=date_str,
+                        article_title=processed_data['title'],
+                        article_description=processed_data['description'],
+                        num_news=len(all_news),
+                        num_images=len(generated_images),
+                        images_dir='output/images'  # Pass images directory
+                    )
                 if success:
                     logger.info("✓ Email sent successfully (PDF + Images ZIP)")
                 else:
@@ -14,7 +14,7 @@ from src.processors import AIProcessor, ContentFilter
 from src.utils.logger import setup_logger
 from src.config import FETCH_HOURS
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
 
 logger = setup_logger('test_full')
 
@@ -25,7 +25,7 @@ def main():
     logger.info("="*80)
 
     # 获取当前时间
-    tz = pytz.timezone('Asia/Shanghai')
+    tz = ZoneInfo('Asia/Shanghai')
     now = datetime.now(tz)
     date_str = now.strftime('%Y-%m-%d')
 
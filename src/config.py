@@ -15,6 +15,8 @@ SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
 OPENROUTER_BASE_URL = os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1')
 OPENROUTER_MODEL = os.getenv('OPENROUTER_MODEL', 'google/gemini-2.0-flash-exp:free')
+# 可选：图片生成直连地址（绕过默认负载均衡入口），未设置时使用 OPENROUTER_BASE_URL
+OPENROUTER_DIRECT_URL = os.getenv('OPENROUTER_DIRECT_URL')
 
 # Gemini Image Generation Model (Nano Banana Pro)
 # google/gemini-3-pro-image-preview - 高级图片生成，支持多语言文字渲染
@@ -25,10 +27,16 @@ ENABLE_AI_SUMMARY = os.getenv('ENABLE_AI_SUMMARY', 'true').lower() == 'true'
 ENABLE_IMAGE_GENERATION = os.getenv('ENABLE_IMAGE_GENERATION', 'true').lower() == 'true'
 ENABLE_PDF_GENERATION = os.getenv('ENABLE_PDF_GENERATION', 'true').lower() == 'true'
 ENABLE_EMAIL_SEND = os.getenv('ENABLE_EMAIL_SEND', 'true').lower() == 'true'
+ENABLE_CONTENT_IMAGES = os.getenv('ENABLE_CONTENT_IMAGES', 'false').lower() == 'true'  # 默认只生成封面图
+
+# Image Generation Settings
+IMAGE_MAX_CONCURRENCY = int(os.getenv('IMAGE_MAX_CONCURRENCY', '4'))  # 并发生成图片数
 
 # Article Generation Settings
 ARTICLE_TARGET_WORDS = int(os.getenv('ARTICLE_TARGET_WORDS', '500'))  # 目标字数
 ARTICLE_MAX_TOKENS = int(os.getenv('ARTICLE_MAX_TOKENS', '1500'))  # API返回上限
+PROMPT_MAX_TOKENS = int(os.getenv('PROMPT_MAX_TOKENS', '6000'))  # 新闻输入总token上限
+PROMPT_ITEM_MAX_TOKENS = int(os.getenv('PROMPT_ITEM_MAX_TOKENS', '400'))  # 单条新闻token上限
 
 # Email Configuration
 EMAIL_SMTP_SERVER = os.getenv('EMAIL_SMTP_SERVER', 'smtp.gmail.com')
@@ -48,6 +56,7 @@ NEWS_SOURCES = {
         'api_url': 'https://api.jinse.cn/noah/v2/lives',
         'language': 'zh',
         'limit': 2,  # 测试模式：抓取2条新闻
+        'page_size': 100,  # 每次请求的条数（服务端返回更少时自动继续翻页）
     },
     'odaily': {
         'enabled': False,  # 禁用（RSSHub不稳定）
@@ -110,6 +119,8 @@ VIDEO_OUTPUT_DIR = os.getenv('VIDEO_OUTPUT_DIR', 'output/videos')
 VIDEO_RESOLUTION = (1920, 1080)  # 1080p
 VIDEO_FPS = 24
 VIDEO_ORIENTATION = 'landscape'  # landscape / portrait
+# H.264 编码器：auto 自动探测硬件编码器（NVENC / VideoToolbox / QuickSync），不可用时使用 libx264
+VIDEO_ENCODER = os.getenv('VIDEO_ENCODER', 'auto')
 
 # 兜底素材目录
 FALLBACK_ASSETS_DIR = 'assets/fallback'
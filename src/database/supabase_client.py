@@ -5,7 +5,7 @@ Supabase database client
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from supabase import create_client, Client
-import pytz
+from zoneinfo import ZoneInfo
 
 from src.config import SUPABASE_URL, SUPABASE_KEY, TIMEZONE
 from src.utils.logger import get_logger
@@ -20,7 +20,7 @@ class SupabaseClient:
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
 
         self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-        self.tz = pytz.timezone(TIMEZONE)
+        self.tz = ZoneInfo(TIMEZONE)
         self.logger.info("Supabase client initialized successfully")
 
     def _clean_content(self, content: str) -> str:
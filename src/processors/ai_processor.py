@@ -2,8 +2,8 @@
 AI Processor for news content using OpenRouter
 """
 
+import re
 from typing import List, Dict, Any
-from openai import OpenAI
 
 from src.config import (
     OPENROUTER_API_KEY,
@@ -11,10 +11,19 @@ from src.config import (
     OPENROUTER_MODEL,
     ENABLE_AI_SUMMARY,
     ARTICLE_TARGET_WORDS,
-    ARTICLE_MAX_TOKENS
+    ARTICLE_MAX_TOKENS,
+    PROMPT_MAX_TOKENS,
+    PROMPT_ITEM_MAX_TOKENS
 )
+from src.utils.clients import get_openai_client
+from src.utils.helpers import loads_json
 from src.utils.logger import get_logger
 
+
+# 回复正文中任意位置的 markdown 代码块（如"好的，以下是…"之后的 ```json）
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+
 class AIProcessor:
     """AI processor using OpenRouter for content generation"""
 
@@ -24,18 +33,7 @@ class AIProcessor:
         if not OPENROUTER_API_KEY:
             raise ValueError("OPENROUTER_API_KEY must be set in environment variables")
 
-        # 创建不带代理的 httpx client
-        import httpx
-        http_client = httpx.Client(
-            base_url=OPENROUTER_BASE_URL,
-            timeout=120.0
-        )
-
-        self.client = OpenAI(
-            api_key=OPENROUTER_API_KEY,
-            base_url=OPENROUTER_BASE_URL,
-            http_client=http_client
-        )
+        self.client = get_openai_client(OPENROUTER_BASE_URL, OPENROUTER_API_KEY, 120.0)
         self.model = OPENROUTER_MODEL
         self.logger.info(f"AI Processor initialized with model: {self.model}")
 
@@ -105,26 +103,84 @@ class AIProcessor:
 
     def _prepare_news_text(self, news_list: List[Dict[str, Any]]) -> str:
         """Prepare news text for AI processing"""
-        news_items = []
-        for i, news in enumerate(news_list, 1):
-            source = news.get('source', '未知来源')
-            title = news.get('title', '')
-            content = news.get('content', '')
-
-            news_items.append(
-                f"{i}. [{source}] {title}\n   {content}"
-            )
+        news_list = self._trim_to_token_budget(news_list)
+
+        # 稳定排序，使相同的新闻集合总是生成逐字节相同的提示词
+        news_list = sorted(
+            news_list,
+            key=lambda n: (n.get('source', ''), n.get('link', '') or str(n.get('id', '')))
+        )
+
+        news_items = [self._format_news_item(i, news) for i, news in enumerate(news_list, 1)]
 
         return "\n\n".join(news_items)
 
-    def _create_prompt(self, news_text: str, date_str: str) -> str:
-        """Create AI prompt"""
-        return f"""请将以下区块链新闻整理成一篇适合TTS语音合成的视频脚本。
+    def _format_news_item(self, index: int, news: Dict[str, Any]) -> str:
+        """Render one numbered news entry as it appears in the prompt"""
+        source = news.get('source', '未知来源')
+        title = news.get('title', '')
+        content = self._truncate_to_tokens(news.get('content', ''), PROMPT_ITEM_MAX_TOKENS)
+        return f"{index}. [{source}] {title}\n   {content}"
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token estimate: one token per CJK character, ~4 chars per token otherwise"""
+        cjk = sum(1 for ch in text if ch >= '\u2e80')
+        return cjk + (len(text) - cjk + 3) // 4
+
+    def _truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """Truncate text so its estimated token count stays within max_tokens"""
+        # 单次扫描累加估算值（与 _estimate_tokens 相同的规则），超出预算即截断
+        cjk = other = 0
+        for end, ch in enumerate(text):
+            if ch >= '\u2e80':
+                cjk += 1
+            else:
+                other += 1
+            if cjk + (other + 3) // 4 > max_tokens:
+                return text[:end] + '...'
+        return text
 
-日期: {date_str}
+    def _trim_to_token_budget(self, news_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep the most important news items whose combined size fits PROMPT_MAX_TOKENS
 
-新闻内容:
-{news_text}
+        Items are ranked by (grade, timestamp) and packed greedily; the original
+        order is preserved in the returned list.
+        """
+        # 按渲染后的条目计费（序号、来源、缩进和截断后缀都计入），序号取最大宽度，
+        # 另加 1 个 token 计条目间的空行；各部分估算之和不小于整段文本的估算值
+        width = len(news_list)
+        costs = [
+            self._estimate_tokens(self._format_news_item(width, news)) + 1
+            for news in news_list
+        ]
+        if sum(costs) <= PROMPT_MAX_TOKENS:
+            return news_list
+
+        ranked = sorted(
+            range(len(news_list)),
+            key=lambda i: (news_list[i].get('grade', 0), news_list[i].get('timestamp', 0)),
+            reverse=True
+        )
+
+        selected = set()
+        total = 0
+        for i in ranked:
+            if total + costs[i] <= PROMPT_MAX_TOKENS:
+                selected.add(i)
+                total += costs[i]
+
+        self.logger.info(
+            f"Trimmed news to {len(selected)}/{len(news_list)} items "
+            f"(~{total} tokens, budget {PROMPT_MAX_TOKENS})"
+        )
+        return [news for i, news in enumerate(news_list) if i in selected]
+
+    def _create_prompt(self, news_text: str, date_str: str) -> str:
+        """Create AI prompt"""
+        # 固定的指令放在最前面，日期和新闻放在最后，便于模型服务端复用前缀缓存
+        return f"""请将文末的区块链新闻整理成一篇适合TTS语音合成的视频脚本。
 
 请按以下要求处理:
 
@@ -167,7 +223,12 @@ class AIProcessor:
    - 使用Markdown，板块用二级标题
    - 不用emoji，不用粗体星号
 
-请直接输出脚本内容。"""
+请直接输出脚本内容。
+
+日期: {date_str}
+
+新闻内容:
+{news_text}"""
 
     def _parse_ai_response(self, ai_response: str, date_str: str) -> Dict[str, Any]:
         """Parse AI response"""
@@ -335,15 +396,7 @@ Nano Banana Pro's industry-leading multilingual text capabilities."
             result = response.choices[0].message.content
 
             # Parse JSON response
-            import json
-            import re
-
-            # Extract JSON from markdown code blocks if present
-            json_match = re.search(r'```json\s*(.*?)\s*```', result, re.DOTALL)
-            if json_match:
-                result = json_match.group(1)
-
-            parsed = json.loads(result)
+            parsed = self._loads_json(result)
 
             self.logger.info(f"Generated attractive title: {parsed['title']}")
             return parsed
@@ -356,6 +409,21 @@ Nano Banana Pro's industry-leading multilingual text capabilities."
                 'cover_prompt': 'Professional blockchain news presenter looking at dramatic market charts, urgent atmosphere, Chinese title text visible'
             }
 
+    def _loads_json(self, text: str) -> Any:
+        """Parse a JSON payload, stripping markdown code fences if present"""
+        # 快速路径：代码块位于回复开头
+        stripped = text.strip().removeprefix('```json').removeprefix('```').removesuffix('```').strip()
+        if not stripped.startswith('{'):
+            # 代码块前有说明文字时，搜索代码块；没有代码块则取第一个 { 到最后一个 }
+            match = _JSON_FENCE_RE.search(text)
+            if match:
+                stripped = match.group(1)
+            else:
+                start, end = text.find('{'), text.rfind('}')
+                if 0 <= start < end:
+                    stripped = text[start:end + 1]
+        return loads_json(stripped)
+
     def _basic_format(self, news_list: List[Dict[str, Any]], date_str: str) -> Dict[str, Any]:
         """Basic formatting without AI"""
         content_parts = [
@@ -2,6 +2,7 @@
 Content filtering and deduplication
 """
 
+import operator
 from typing import List, Dict, Any
 from src.utils.helpers import deduplicate_news, filter_quality_news
 from src.utils.logger import get_logger
@@ -36,6 +37,8 @@ class ContentFilter:
         self.logger.info(f"After quality filter: {len(news_list)} items")
 
         # Sort by timestamp (newest first)
-        news_list.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+        for news in news_list:
+            news.setdefault('timestamp', 0)
+        news_list.sort(key=operator.itemgetter('timestamp'), reverse=True)
 
         return news_list
@@ -2,43 +2,271 @@
 Image Generator using OpenRouter Gemini Image API
 """
 
-from typing import List, Dict, Any
-import base64
+from typing import List, Dict, Any, Optional
+import functools
+import hashlib
+import logging
 import os
+import re
+import shutil
+import threading
 import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from openai import OpenAI
+
+from PIL import Image, PngImagePlugin
+
+try:
+    # SIMD 加速的 base64 解码（接口与标准库兼容）
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 from src.config import (
     OPENROUTER_API_KEY,
     OPENROUTER_BASE_URL,
+    OPENROUTER_DIRECT_URL,
     GEMINI_IMAGE_MODEL,
-    OPENROUTER_MODEL
+    OPENROUTER_MODEL,
+    ENABLE_CONTENT_IMAGES,
+    IMAGE_MAX_CONCURRENCY
 )
+from src.utils.clients import get_openai_client, get_http_session
+from src.utils.helpers import loads_json, dumps_json, link_or_copy
 from src.utils.logger import get_logger
 
 
+IMAGE_CACHE_TTL = 30 * 86400  # 图片缓存有效期（秒）
+IMAGE_CACHE_MAX_ENTRIES = 500  # 图片缓存最多保留的文件数（按修改时间淘汰最旧的）
+BASE64_CHUNK_CHARS = 4 * 65536  # base64 分块解码长度（4 的倍数，每块解码为 192 KB）
+
+# 兜底提示词的主题分类关键词（按优先级排列）
+CATEGORY_KEYWORDS = {
+    '市场': ['市场', '价格', '交易', 'BTC', 'ETH', '币'],
+    '政策': ['政策', '监管', '合规', '法律', '政府'],
+    'DeFi': ['DeFi', '去中心化', '质押', '收益', 'TVL'],
+    'NFT': ['NFT', '数字藏品', '艺术品'],
+    '技术': ['技术', '升级', '创新', '协议', '网络'],
+    '投融资': ['融资', '投资', '资金', 'VC', '轮'],
+    '行业': ['行业', '合作', '机构', '生态']
+}
+
+# 每个分类预编译为一个正则（关键词取并集），一次扫描判断是否命中
+_CATEGORY_PATTERNS = [
+    (cat, re.compile('|'.join(map(re.escape, keywords))))
+    for cat, keywords in CATEGORY_KEYWORDS.items()
+]
+
+# Vivid storytelling templates for different blockchain topics
+PPT_STYLES = {
+    '市场': 'Professional business person in suit pointing at large digital screen showing Bitcoin price chart with dramatic green arrow going up, modern office setting, excited expression, floating cryptocurrency coins and holograms, dynamic and energetic atmosphere',
+    '政策': 'Diverse group of government officials and business leaders sitting around conference table discussing blockchain policy, serious expressions, world map on wall showing global regulations, professional meeting room, documents and laptops on table',
+    'DeFi': 'Young tech entrepreneur presenting DeFi concept on futuristic holographic display, floating smart contract symbols and percentage yields, modern startup office, innovative and forward-thinking atmosphere, blockchain network visualization in background',
+    'NFT': 'Creative digital artist working on NFT artwork, surrounded by floating digital art pieces and blockchain symbols, colorful and vibrant studio environment, excited expression looking at successful NFT sale notification',
+    '技术': 'Team of diverse software engineers collaborating on blockchain technology upgrade, looking at large screens showing network diagrams and code, modern tech office, innovative problem-solving atmosphere, excitement about breakthrough',
+    '投融资': 'Business handshake between investor and blockchain startup founder, with floating money symbols and funding round graphics, professional office setting, celebratory atmosphere, venture capital logos in background',
+    '行业': 'Conference hall with speaker presenting blockchain industry trends to engaged audience, large presentation screen showing ecosystem growth chart, professional business setting, audience taking notes and looking interested'
+}
+
+# 兜底提示词模板（针对 Nano Banana Pro 的中文文字渲染优化）
+_FALLBACK_PROMPT_TEMPLATE = """Create a professional YouTube presentation image about '{title}' with excellent Chinese text rendering.
+
+**KEY REQUIREMENT: Use Nano Banana Pro's industry-leading multilingual text rendering to include clear, readable Chinese text throughout the image**
+
+Scene Setup (16:9 horizontal):
+- {content_suggestion}
+- Real people (1-3 business professionals, experts, or presenters)
+- Modern professional setting (office, conference room, or presentation hall)
+- Dynamic and engaging composition
+
+Text Elements (CRITICAL - Nano Banana Pro excels at this):
+- **Large title**: "{title}" in bold Chinese characters (72pt+), prominently displayed on digital screen or backdrop
+- **Key data points**: 3-4 Chinese labels with numbers/statistics on floating holographic displays
+- **Bullet points**: Short Chinese text phrases highlighting main points
+- **Subtitles**: Optional Chinese subtitles or captions for context
+- All text must be crystal clear, readable, and properly rendered in Chinese
+
+Visual Composition:
+- Professional business people (diverse, showing appropriate emotions)
+- Large digital screens/monitors displaying the Chinese title prominently
+- Floating holographic UI elements with Chinese text and data
+- Modern technology environment (sleek, professional)
+- Cryptocurrency/blockchain visual elements (coins, network diagrams, charts)
+
+Text Rendering Quality:
+- Use Nano Banana Pro's advanced typography capabilities
+- Ensure all Chinese characters are crisp, clear, and professionally typeset
+- Text should look like it's from a high-end business presentation
+- Multiple text elements at different sizes (title 72pt, data 48pt, labels 36pt)
+- Perfect alignment and spacing for Chinese text
+
+Color Scheme:
+- Professional gradient background (dark blue #1a1f3a to purple #2d1b4e)
+- White text (#FFFFFF) for maximum contrast and readability
+- Accent colors: Green #00FF88 (positive), Red #FF4444 (negative), Gold #FFD700 (highlights)
+- Modern, clean, high-tech aesthetic
+
+People & Emotion:
+- 1-3 professional figures (business attire)
+- Appropriate emotions for the topic (excitement, analysis, concern, or enthusiasm)
+- Natural poses (presenting, discussing, pointing at screens)
+- Diverse representation
+
+Atmosphere:
+- Professional business/tech setting
+- Cinematic lighting with dramatic accents
+- High-end corporate presentation quality
+- Suitable for YouTube video thumbnail or background
+- Engaging and visually striking
+
+Technical Specs:
+- 16:9 aspect ratio (ideal for YouTube)
+- High resolution (2K or higher)
+- Photorealistic or high-quality digital art style
+- Professional business aesthetic
+- Optimized for video recording and presentation
+
+Special Focus for Nano Banana Pro:
+- Leverage the model's exceptional Chinese text rendering
+- Include multiple text elements (title, data, labels, captions)
+- Ensure text is central to the composition, not just decorative
+- Make the image information-rich with clear Chinese typography
+- Professional infographic quality with human elements
+
+Overall: A professional YouTube presentation image that combines engaging human elements with crystal-clear Chinese text rendering, leveraging Nano Banana Pro's superior multilingual typography to create an information-rich, visually striking image perfect for blockchain news presentation."""
+
+_SECTION_HEADER_RE = re.compile(r'^## .*$', re.MULTILINE)
+
+_SANITIZE_SPECIAL_RE = re.compile(r'[^\w\s-]')
+_SANITIZE_SPACE_RE = re.compile(r'\s+')
+
+_PROMPT_FIELDS = ("section", "title", "description", "prompt")
+
+# LLM 返回的板块名可能带 "Section 1:" 之类的序号前缀
+_SECTION_LABEL_PREFIX_RE = re.compile(r'^(?:section|板块)\s*\d+\s*[:：.、]?\s*', re.IGNORECASE)
+_SECTION_LABEL_SPACE_RE = re.compile(r'[\s#*]+')
+
+# 提示词生成的结构化输出 schema（严格 JSON，避免解析失败后走兜底逻辑）
+IMAGE_PROMPTS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "image_prompts",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "prompts": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "section": {"type": "string"},
+                            "title": {"type": "string"},
+                            "description": {"type": "string"},
+                            "prompt": {"type": "string"}
+                        },
+                        "required": list(_PROMPT_FIELDS),
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["prompts"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# 生成内容图提示词的固定指令（与每日内容无关，放在请求最前面）
+IMAGE_PROMPTS_INSTRUCTIONS = """根据用户提供的区块链新闻文章的各个板块，为每个板块生成专业的 **YouTube 视频演讲 PPT 风格**信息图表描述。
+
+要求（适合 YouTube 视频演讲的 PPT 风格）:
+1. **16:9 横屏布局** - 适合视频录制和演讲
+2. **高对比度配色** - 确保在视频中清晰可见
+3. **大号中文标题** - 观众能从远处看清
+4. **简洁明了** - 每张图只传达一个核心信息
+5. **专业商务风格** - 类似 PowerPoint 演示文稿
+6. **图标+数据** - 视觉化呈现关键信息
+
+图片风格参考：
+- 类似 TED 演讲的 PPT
+- 企业级商业报告
+- YouTube 财经频道的演示图表
+
+配色方案：
+- 主色：深蓝色/紫色渐变背景
+- 强调色：亮绿色（涨）、红色（跌）、金色（重点）
+- 文字：白色或浅色（高对比度）
+
+请以JSON格式返回，prompts 数组中每个板块一个对象:
+{
+  "prompts": [
+    {
+      "section": "板块名称",
+      "title": "中文标题（将出现在PPT中）",
+      "description": "简短描述（用于PDF说明）",
+      "prompt": "详细的英文PPT风格图片生成提示词"
+    }
+  ]
+}
+
+Prompt示例格式：
+"Create a professional PowerPoint-style slide for YouTube presentation about '[Chinese Title]'.
+Layout: 16:9 horizontal, modern business presentation
+Background: Gradient from dark blue to purple, professional and clean
+Title: Large bold Chinese text '[Chinese Title]' at top center, white color, highly visible
+Content: 3 key points with icons (cryptocurrency/blockchain themed), large numbers/statistics, simple charts
+Color scheme: Dark gradient background, white text, green for positive data, red for negative, gold for highlights
+Icons: Modern, flat design, crypto/blockchain related (Bitcoin symbol, chart icons, etc.)
+Style: YouTube presentation ready, high contrast for video recording, suitable for business presentation, clean and professional, similar to TED talk slides"
+
+注意：
+- 强调 16:9 横屏布局（YouTube 标准）
+- 高对比度（视频录制友好）
+- 大号中文标题（演讲可见性）
+- 简洁内容（一张图一个重点）"""
+
+
+@functools.lru_cache(maxsize=64)
+def _fallback_prompt(title: str) -> str:
+    """Build the fallback image prompt for a section title"""
+    # Find matching category (first category in priority order, default 行业)
+    category = next(
+        (cat for cat, pattern in _CATEGORY_PATTERNS if pattern.search(title)),
+        '行业'
+    )
+
+    # Generate YouTube storytelling prompt optimized for Nano Banana Pro's text rendering
+    return _FALLBACK_PROMPT_TEMPLATE.format_map({
+        'title': title,
+        'content_suggestion': PPT_STYLES.get(category, PPT_STYLES['行业'])
+    })
+
+
 class ImageGenerator:
     """Generate images based on article content using Gemini Image API"""
 
-    def __init__(self):
+    def __init__(self, cache_dir: str = "cache"):
         self.logger = get_logger('image_generator')
 
         if not OPENROUTER_API_KEY:
             raise ValueError("OPENROUTER_API_KEY must be set in environment variables")
 
-        # 创建不带代理的 httpx client
-        import httpx
-        http_client = httpx.Client(
-            base_url=OPENROUTER_BASE_URL,
-            timeout=120.0
-        )
-
-        self.client = OpenAI(
-            api_key=OPENROUTER_API_KEY,
-            base_url=OPENROUTER_BASE_URL,
-            http_client=http_client
-        )
+        self.client = get_openai_client(OPENROUTER_BASE_URL, OPENROUTER_API_KEY, 120.0)
+        # 复用连接池，避免每张图片重新进行TCP/TLS握手
+        self.http = get_http_session()
+        self.api_url = (OPENROUTER_DIRECT_URL or OPENROUTER_BASE_URL).rstrip('/') + "/chat/completions"
+        # 按板块内容缓存生成的图片提示词
+        self.prompt_cache_dir = Path(cache_dir) / "image_prompts"
+        # 按提示词缓存生成的图片，相同提示词不再重复调用 API
+        self.image_cache_dir = Path(cache_dir) / "images"
+        # 目录只在初始化时创建一次，并发写图片时不再重复 mkdir
+        self.prompt_cache_dir.mkdir(parents=True, exist_ok=True)
+        self.image_cache_dir.mkdir(parents=True, exist_ok=True)
+        # 已创建的输出目录（按 output_dir/date_str 缓存）
+        self._dir_cache: Dict[str, Path] = {}
+        # 封面图与内容图共用的并发上限，同时在途的图片请求不超过 IMAGE_MAX_CONCURRENCY
+        self._request_slots = threading.BoundedSemaphore(max(1, IMAGE_MAX_CONCURRENCY))
         # 封面使用高级模型（Nano Banana Pro）
         self.cover_model = GEMINI_IMAGE_MODEL  # google/gemini-3-pro-image-preview
         # 内容图使用免费/便宜模型（Gemini 2.5 Flash）
@@ -70,20 +298,14 @@ class ImageGenerator:
             self.logger.info(f"Generating cover image with title: {attractive_title}")
 
             # Create output directory
-            output_path = Path(output_dir) / date_str
-            output_path.mkdir(parents=True, exist_ok=True)
-
-            # Generate cover image using premium model (Nano Banana Pro)
-            image_data = self._generate_single_image(cover_prompt, use_cover_model=True)
-
-            if image_data:
-                # Save cover image with special naming
-                image_filename = f"00_COVER_{self._sanitize_filename(attractive_title)}.png"
-                image_path = output_path / image_filename
+            output_path = self._ensure_output_dir(output_dir, date_str)
 
-                with open(image_path, 'wb') as f:
-                    f.write(image_data)
+            # Save cover image with special naming
+            image_filename = f"00_COVER_{self._sanitize_filename(attractive_title)}.png"
+            image_path = output_path / image_filename
 
+            # Generate cover image using premium model (Nano Banana Pro)
+            if self._generate_single_image(cover_prompt, image_path, use_cover_model=True):
                 self.logger.info(f"✓ Cover image saved: {image_path}")
 
                 return {
@@ -124,21 +346,39 @@ class ImageGenerator:
         """
         try:
             generated_images = []
-
-            # Generate cover image first (if provided)
-            if cover_prompt and attractive_title:
-                self.logger.info("Generating cover image...")
-                cover_image = self.generate_cover_image(
-                    cover_prompt=cover_prompt,
-                    attractive_title=attractive_title,
-                    date_str=date_str,
-                    output_dir=output_dir
-                )
-                if cover_image:
-                    generated_images.append(cover_image)
-
-            # 只生成封面图，不生成内容图
-            self.logger.info("✅ Cover-only mode: Skipping content images generation")
+            content_images = []
+
+            # 封面图与内容图提示词生成互不依赖，封面图在后台线程中同时生成
+            with ThreadPoolExecutor(max_workers=1) as cover_executor:
+                cover_future = None
+                if cover_prompt and attractive_title:
+                    self.logger.info("Generating cover image...")
+                    cover_future = cover_executor.submit(
+                        self.generate_cover_image,
+                        cover_prompt=cover_prompt,
+                        attractive_title=attractive_title,
+                        date_str=date_str,
+                        output_dir=output_dir
+                    )
+
+                if ENABLE_CONTENT_IMAGES:
+                    # 重跑时只会补齐缺失的图片：提示词按板块内容缓存，图片按提示词缓存
+                    sections = self._parse_article_sections(article_content)
+                    self.logger.info(f"Found {len(sections)} sections, generating content images...")
+                    image_prompts = self._generate_image_prompts(sections, date_str)
+                    content_images = self._generate_content_images(image_prompts, date_str, output_dir)
+                else:
+                    # 只生成封面图，不生成内容图
+                    self.logger.info("✅ Cover-only mode: Skipping content images generation")
+
+                cover_image = cover_future.result() if cover_future else None
+
+            # Cover image always comes first
+            if cover_image:
+                generated_images.append(cover_image)
+            generated_images.extend(content_images)
+
+            self._prune_image_cache()
 
             self.logger.info(f"Successfully generated {len(generated_images)} images total (including cover)")
             return generated_images
@@ -147,267 +387,400 @@ class ImageGenerator:
             self.logger.error(f"Error in image generation: {e}")
             return []
 
+    def _generate_content_images(
+        self,
+        image_prompts: List[Dict[str, str]],
+        date_str: str,
+        output_dir: str = "output/images"
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate content images concurrently
+
+        Image generation is network-bound, so prompts are sent in parallel on a
+        thread pool. In-flight API calls (including the cover) share a bounded
+        semaphore of IMAGE_MAX_CONCURRENCY slots. Results keep the order of
+        image_prompts so filename indices stay stable.
+
+        Args:
+            image_prompts: List of prompt dicts with section, title, description, prompt
+            date_str: Date string (YYYY-MM-DD)
+            output_dir: Directory to save images
+
+        Returns:
+            List of image info dicts for the images that were generated
+        """
+        if not image_prompts:
+            return []
+
+        output_dir_str = str(self._ensure_output_dir(output_dir, date_str))
+
+        image_paths = [
+            os.path.join(output_dir_str, f"{i:02d}_{self._sanitize_filename(p['title'])}.png")
+            for i, p in enumerate(image_prompts, 1)
+        ]
+
+        total = len(image_prompts)
+
+        def generate(job):
+            i, prompt_info, image_path = job
+            self.logger.info("Generating image %d/%d: %s", i, total, prompt_info['title'])
+            return self._generate_single_image(prompt_info['prompt'], image_path)
+
+        workers = max(1, min(IMAGE_MAX_CONCURRENCY, total))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                generate,
+                zip(range(1, total + 1), image_prompts, image_paths)
+            ))
+
+        images = []
+        for prompt_info, image_path, ok in zip(image_prompts, image_paths, results):
+            if not ok:
+                self.logger.warning("Failed to generate image for section: %s", prompt_info.get('section'))
+                continue
+
+            self.logger.info("✓ Image saved: %s", image_path)
+            images.append({
+                'path': image_path,
+                'title': prompt_info['title'],
+                'description': prompt_info.get('description', ''),
+                'section': prompt_info.get('section', '')
+            })
+
+        return images
+
+    def _ensure_output_dir(self, output_dir: str, date_str: str) -> Path:
+        """Create output_dir/date_str once and return it"""
+        key = os.path.join(output_dir, date_str)
+        output_path = self._dir_cache.get(key)
+        if output_path is None:
+            output_path = Path(key)
+            output_path.mkdir(parents=True, exist_ok=True)
+            self._dir_cache[key] = output_path
+        return output_path
+
     def _parse_article_sections(self, content: str) -> List[Dict[str, str]]:
         """Parse article into major sections"""
+        # 一次正则扫描拿到每个 "## " 标题行的位置，再按位置切片原文
+        headers = list(_SECTION_HEADER_RE.finditer(content))
+
         sections = []
-        current_section = None
-        current_content = []
-
-        for line in content.split('\n'):
-            # Detect main section headers (## )
-            if line.startswith('## '):
-                # Save previous section
-                if current_section:
-                    sections.append({
-                        'title': current_section,
-                        'content': '\n'.join(current_content)
-                    })
-
-                # Start new section
-                current_section = line.replace('##', '').strip()
-                current_content = []
-            elif current_section:
-                current_content.append(line)
-
-        # Add last section
-        if current_section:
+        for i, match in enumerate(headers):
+            title = match.group(0).replace('##', '').strip()
+            if not title:
+                continue
+            body_end = headers[i + 1].start() - 1 if i + 1 < len(headers) else len(content)
             sections.append({
-                'title': current_section,
-                'content': '\n'.join(current_content)
+                'title': title,
+                'content': content[match.end() + 1:body_end]
             })
 
         return sections
 
     def _generate_image_prompts(self, sections: List[Dict[str, str]], date_str: str) -> List[Dict[str, str]]:
-        """Generate image prompts for each section using AI"""
+        """Generate image prompts for each section using AI (cached by section content)"""
         try:
-            # Prepare sections summary
-            sections_text = "\n\n".join([
-                f"Section {i+1}: {s['title']}\n{s['content'][:500]}..."
-                for i, s in enumerate(sections[:6])  # Limit to first 6 sections
-            ])
-
-            prompt = f"""根据以下区块链新闻文章的各个板块，为每个板块生成专业的 **YouTube 视频演讲 PPT 风格**信息图表描述。
-
-日期: {date_str}
-
-文章板块:
-{sections_text}
-
-要求（适合 YouTube 视频演讲的 PPT 风格）:
-1. **16:9 横屏布局** - 适合视频录制和演讲
-2. **高对比度配色** - 确保在视频中清晰可见
-3. **大号中文标题** - 观众能从远处看清
-4. **简洁明了** - 每张图只传达一个核心信息
-5. **专业商务风格** - 类似 PowerPoint 演示文稿
-6. **图标+数据** - 视觉化呈现关键信息
+            sections = sections[:6]  # Limit to first 6 sections
+
+            # 先查缓存，只把未命中的板块发给 LLM
+            prompts = [None] * len(sections)
+            misses = []
+            for i, section in enumerate(sections):
+                key = self._section_cache_key(section)
+                cached = self._load_cached_prompt(key)
+                if cached:
+                    prompts[i] = cached
+                else:
+                    misses.append((i, key))
+
+            if misses:
+                self.logger.info(f"Image prompt cache: {len(sections) - len(misses)} hits, {len(misses)} misses")
+                generated = self._request_image_prompts([sections[i] for i, _ in misses], date_str)
+                # 按返回的板块名匹配，而不是按位置：模型可能漏掉、合并或打乱板块
+                matched = self._match_prompts_to_sections(
+                    [sections[i] for i, _ in misses], generated
+                )
+                for (i, key), prompt_info in zip(misses, matched):
+                    if prompt_info is None:
+                        # 未匹配的板块用兜底提示词，且不写入缓存
+                        self.logger.warning(f"No image prompt returned for section: {sections[i]['title']}")
+                        prompts[i] = self._fallback_prompt_info(sections[i])
+                    else:
+                        prompts[i] = prompt_info
+                        self._save_cached_prompt(key, prompt_info)
+            else:
+                self.logger.info(f"Image prompt cache: all {len(sections)} sections hit")
 
-图片风格参考：
-- 类似 TED 演讲的 PPT
-- 企业级商业报告
-- YouTube 财经频道的演示图表
+            return [p for p in prompts if p]
 
-配色方案：
-- 主色：深蓝色/紫色渐变背景
-- 强调色：亮绿色（涨）、红色（跌）、金色（重点）
-- 文字：白色或浅色（高对比度）
-
-请以JSON格式返回，每个板块一个对象:
-[
-  {{
-    "section": "板块名称",
-    "title": "中文标题（将出现在PPT中）",
-    "description": "简短描述（用于PDF说明）",
-    "prompt": "详细的英文PPT风格图片生成提示词"
-  }}
-]
+        except Exception as e:
+            self.logger.error(f"Error generating image prompts: {e}")
+            # Fallback: generate simple prompts
+            return self._generate_fallback_prompts(sections)
 
-Prompt示例格式：
-"Create a professional PowerPoint-style slide for YouTube presentation about '[Chinese Title]'.
-Layout: 16:9 horizontal, modern business presentation
-Background: Gradient from dark blue to purple, professional and clean
-Title: Large bold Chinese text '[Chinese Title]' at top center, white color, highly visible
-Content: 3 key points with icons (cryptocurrency/blockchain themed), large numbers/statistics, simple charts
-Color scheme: Dark gradient background, white text, green for positive data, red for negative, gold for highlights
-Icons: Modern, flat design, crypto/blockchain related (Bitcoin symbol, chart icons, etc.)
-Style: YouTube presentation ready, high contrast for video recording, suitable for business presentation, clean and professional, similar to TED talk slides"
+    def _request_image_prompts(self, sections: List[Dict[str, str]], date_str: str) -> List[Optional[Dict[str, str]]]:
+        """Ask the LLM for image prompts for the given sections (None for malformed records)"""
+        # Prepare sections summary
+        sections_text = "\n\n".join([
+            f"Section {i+1}: {s['title']}\n{s['content'][:500]}..."
+            for i, s in enumerate(sections)
+        ])
 
-注意：
-- 强调 16:9 横屏布局（YouTube 标准）
-- 高对比度（视频录制友好）
-- 大号中文标题（演讲可见性）
-- 简洁内容（一张图一个重点）"""
+        # 静态指令作为 system 消息放在最前面，可被服务端前缀缓存复用
+        prompt = f"""日期: {date_str}
 
-            response = self.client.chat.completions.create(
-                model="google/gemini-2.0-flash-exp:free",  # 使用免费模型生成提示词
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=4000
-            )
+文章板块:
+{sections_text}"""
+
+        response = self.client.chat.completions.create(
+            model="google/gemini-2.0-flash-exp:free",  # 使用免费模型生成提示词
+            messages=[
+                {
+                    "role": "system",
+                    # 标记固定前缀可缓存（OpenRouter 透传给支持显式缓存的模型）
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": IMAGE_PROMPTS_INSTRUCTIONS,
+                            "cache_control": {"type": "ephemeral"}
+                        }
+                    ]
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.7,
+            max_tokens=8000,
+            response_format=IMAGE_PROMPTS_RESPONSE_FORMAT
+        )
 
-            result = response.choices[0].message.content
+        result = response.choices[0].message.content
+
+        # Structured output guarantees a single JSON object; records missing a
+        # field become None in place so no later record shifts position
+        records = [
+            p if isinstance(p, dict) and all(isinstance(p.get(k), str) for k in _PROMPT_FIELDS) else None
+            for p in loads_json(result)['prompts']
+        ]
+        invalid = records.count(None)
+        if invalid:
+            self.logger.warning(f"Ignoring {invalid} malformed image prompt record(s)")
+        return records
+
+    @staticmethod
+    def _normalize_section_label(label: str) -> str:
+        """Normalize a section name for matching LLM output against parsed titles"""
+        label = _SECTION_LABEL_PREFIX_RE.sub('', label.strip())
+        return _SECTION_LABEL_SPACE_RE.sub('', label).casefold()
+
+    def _match_prompts_to_sections(
+        self,
+        sections: List[Dict[str, str]],
+        generated: List[Optional[Dict[str, str]]]
+    ) -> List[Optional[Dict[str, str]]]:
+        """
+        Match generated prompt records to sections by their section/title field
 
-            # Parse JSON response
-            import json
-            import re
+        A record is used only when its label identifies exactly one section
+        that has not been matched yet.
 
-            # Extract JSON from markdown code blocks if present
-            json_match = re.search(r'```json\s*(.*?)\s*```', result, re.DOTALL)
-            if json_match:
-                result = json_match.group(1)
+        Args:
+            sections: Sections the prompts were requested for
+            generated: Prompt records returned by the LLM (None for malformed ones)
 
-            prompts = json.loads(result)
-            return prompts
+        Returns:
+            One prompt record per section, None where nothing matched
+        """
+        by_label: Dict[str, List[int]] = {}
+        for i, section in enumerate(sections):
+            by_label.setdefault(self._normalize_section_label(section['title']), []).append(i)
+
+        matched: List[Optional[Dict[str, str]]] = [None] * len(sections)
+        for prompt_info in generated:
+            if prompt_info is None:
+                continue
+            for field in ('section', 'title'):
+                candidates = by_label.get(self._normalize_section_label(prompt_info[field]), [])
+                if len(candidates) == 1:
+                    break
+            else:
+                continue
+            i = candidates[0]
+            if matched[i] is None:
+                matched[i] = prompt_info
+
+        return matched
+
+    def _section_cache_key(self, section: Dict[str, str]) -> str:
+        """Cache key for a section: SHA256 of its title and first 500 chars"""
+        raw = f"{section['title'].strip()}|{section['content'][:500].strip()}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _load_cached_prompt(self, key: str) -> Optional[Dict[str, str]]:
+        """Load a cached image prompt, or None on miss"""
+        cache_path = self.prompt_cache_dir / f"{key}.json"
+        if not cache_path.exists():
+            return None
+        try:
+            return loads_json(cache_path.read_bytes())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable prompt cache entry {cache_path.name}: {e}")
+            return None
 
-        except Exception as e:
-            self.logger.error(f"Error generating image prompts: {e}")
-            # Fallback: generate simple prompts
-            return self._generate_fallback_prompts(sections)
+    def _save_cached_prompt(self, key: str, prompt_info: Dict[str, str]):
+        """Persist an image prompt to the cache"""
+        try:
+            (self.prompt_cache_dir / f"{key}.json").write_bytes(dumps_json(prompt_info))
+        except OSError as e:
+            self.logger.warning(f"Failed to write prompt cache: {e}")
 
     def _generate_fallback_prompts(self, sections: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """Generate YouTube presentation-style prompts with vivid storytelling (fallback when AI generation fails)"""
-        prompts = []
-
-        # Vivid storytelling templates for different blockchain topics
-        ppt_styles = {
-            '市场': 'Professional business person in suit pointing at large digital screen showing Bitcoin price chart with dramatic green arrow going up, modern office setting, excited expression, floating cryptocurrency coins and holograms, dynamic and energetic atmosphere',
-            '政策': 'Diverse group of government officials and business leaders sitting around conference table discussing blockchain policy, serious expressions, world map on wall showing global regulations, professional meeting room, documents and laptops on table',
-            'DeFi': 'Young tech entrepreneur presenting DeFi concept on futuristic holographic display, floating smart contract symbols and percentage yields, modern startup office, innovative and forward-thinking atmosphere, blockchain network visualization in background',
-            'NFT': 'Creative digital artist working on NFT artwork, surrounded by floating digital art pieces and blockchain symbols, colorful and vibrant studio environment, excited expression looking at successful NFT sale notification',
-            '技术': 'Team of diverse software engineers collaborating on blockchain technology upgrade, looking at large screens showing network diagrams and code, modern tech office, innovative problem-solving atmosphere, excitement about breakthrough',
-            '投融资': 'Business handshake between investor and blockchain startup founder, with floating money symbols and funding round graphics, professional office setting, celebratory atmosphere, venture capital logos in background',
-            '行业': 'Conference hall with speaker presenting blockchain industry trends to engaged audience, large presentation screen showing ecosystem growth chart, professional business setting, audience taking notes and looking interested'
+        # Limit to 5 images
+        return [self._fallback_prompt_info(section) for section in sections[:5]]
+
+    @staticmethod
+    def _fallback_prompt_info(section: Dict[str, str]) -> Dict[str, str]:
+        """Fallback prompt record for a single section"""
+        return {
+            'section': section['title'],
+            'title': section['title'],
+            'description': f"{section['title']}的专业PPT风格可视化",
+            'prompt': _fallback_prompt(section['title'])
         }
 
-        for i, section in enumerate(sections[:5]):  # Limit to 5 images
-            title = section['title']
-
-            # Determine topic category
-            category_keywords = {
-                '市场': ['市场', '价格', '交易', 'BTC', 'ETH', '币'],
-                '政策': ['政策', '监管', '合规', '法律', '政府'],
-                'DeFi': ['DeFi', '去中心化', '质押', '收益', 'TVL'],
-                'NFT': ['NFT', '数字藏品', '艺术品'],
-                '技术': ['技术', '升级', '创新', '协议', '网络'],
-                '投融资': ['融资', '投资', '资金', 'VC', '轮'],
-                '行业': ['行业', '合作', '机构', '生态']
-            }
-
-            # Find matching category
-            category = '行业'  # default
-            for cat, keywords in category_keywords.items():
-                if any(kw in title for kw in keywords):
-                    category = cat
-                    break
-
-            # Get style template
-            content_suggestion = ppt_styles.get(category, ppt_styles['行业'])
-
-            # Generate YouTube storytelling prompt optimized for Nano Banana Pro's text rendering
-            prompt = f"""Create a professional YouTube presentation image about '{title}' with excellent Chinese text rendering.
+    def _generate_single_image(
+        self,
+        prompt: str,
+        output_path: str,
+        use_cover_model: bool = False
+    ) -> bool:
+        """
+        Generate a single image using specified model and write it to output_path
 
-**KEY REQUIREMENT: Use Nano Banana Pro's industry-leading multilingual text rendering to include clear, readable Chinese text throughout the image**
+        Identical (model, prompt) pairs are served from the on-disk image cache.
 
-Scene Setup (16:9 horizontal):
-- {content_suggestion}
-- Real people (1-3 business professionals, experts, or presenters)
-- Modern professional setting (office, conference room, or presentation hall)
-- Dynamic and engaging composition
+        Args:
+            prompt: Image generation prompt
+            output_path: File to write the image to
+            use_cover_model: If True, use premium Nano Banana Pro for cover;
+                           If False, use Gemini 2.5 Flash for content images
 
-Text Elements (CRITICAL - Nano Banana Pro excels at this):
-- **Large title**: "{title}" in bold Chinese characters (72pt+), prominently displayed on digital screen or backdrop
-- **Key data points**: 3-4 Chinese labels with numbers/statistics on floating holographic displays
-- **Bullet points**: Short Chinese text phrases highlighting main points
-- **Subtitles**: Optional Chinese subtitles or captions for context
-- All text must be crystal clear, readable, and properly rendered in Chinese
+        Returns:
+            True if the image was written, False if failed
+        """
+        model = self.cover_model if use_cover_model else self.content_model
+        cache_path = self._image_cache_path(model, prompt)
 
-Visual Composition:
-- Professional business people (diverse, showing appropriate emotions)
-- Large digital screens/monitors displaying the Chinese title prominently
-- Floating holographic UI elements with Chinese text and data
-- Modern technology environment (sleek, professional)
-- Cryptocurrency/blockchain visual elements (coins, network diagrams, charts)
+        if self._is_cache_fresh(cache_path):
+            try:
+                link_or_copy(cache_path, output_path)
+                # 命中时刷新修改时间，淘汰时按最近使用顺序保留
+                os.utime(cache_path)
+                self.logger.info("✓ Using cached image: %s", cache_path.name)
+                return True
+            except OSError as e:
+                self.logger.warning("Failed to read image cache: %s", e)
 
-Text Rendering Quality:
-- Use Nano Banana Pro's advanced typography capabilities
-- Ensure all Chinese characters are crisp, clear, and professionally typeset
-- Text should look like it's from a high-end business presentation
-- Multiple text elements at different sizes (title 72pt, data 48pt, labels 36pt)
-- Perfect alignment and spacing for Chinese text
+        if not self._request_image(prompt, output_path, use_cover_model):
+            return False
 
-Color Scheme:
-- Professional gradient background (dark blue #1a1f3a to purple #2d1b4e)
-- White text (#FFFFFF) for maximum contrast and readability
-- Accent colors: Green #00FF88 (positive), Red #FF4444 (negative), Gold #FFD700 (highlights)
-- Modern, clean, high-tech aesthetic
+        # 在当前工作线程中无损压缩（zlib 会释放 GIL，与其他图片的网络请求并行）
+        self._optimize_png(output_path)
 
-People & Emotion:
-- 1-3 professional figures (business attire)
-- Appropriate emotions for the topic (excitement, analysis, concern, or enthusiasm)
-- Natural poses (presenting, discussing, pointing at screens)
-- Diverse representation
-
-Atmosphere:
-- Professional business/tech setting
-- Cinematic lighting with dramatic accents
-- High-end corporate presentation quality
-- Suitable for YouTube video thumbnail or background
-- Engaging and visually striking
+        try:
+            link_or_copy(output_path, cache_path)
+        except OSError as e:
+            self.logger.warning("Failed to write image cache: %s", e)
+        return True
 
-Technical Specs:
-- 16:9 aspect ratio (ideal for YouTube)
-- High resolution (2K or higher)
-- Photorealistic or high-quality digital art style
-- Professional business aesthetic
-- Optimized for video recording and presentation
+    def _optimize_png(self, image_path: str):
+        """Losslessly recompress a PNG in place, keeping it only if smaller"""
+        try:
+            original_size = os.path.getsize(image_path)
+            tmp_path = Path(f"{image_path}.tmp")
+            with Image.open(image_path) as img:
+                if img.format != 'PNG':
+                    return
+                # 重新保存会丢弃 iCCP / 文本块，显式带上以保证无损
+                pnginfo = PngImagePlugin.PngInfo()
+                for key, value in img.text.items():
+                    pnginfo.add_text(key, value)
+                img.save(
+                    tmp_path, format='PNG', optimize=True, pnginfo=pnginfo,
+                    icc_profile=img.info.get('icc_profile'), exif=img.info.get('exif')
+                )
 
-Special Focus for Nano Banana Pro:
-- Leverage the model's exceptional Chinese text rendering
-- Include multiple text elements (title, data, labels, captions)
-- Ensure text is central to the composition, not just decorative
-- Make the image information-rich with clear Chinese typography
-- Professional infographic quality with human elements
+            optimized_size = os.path.getsize(tmp_path)
+            if optimized_size < original_size:
+                os.replace(tmp_path, image_path)
+                self.logger.info("Optimized PNG: %d -> %d bytes", original_size, optimized_size)
+            else:
+                tmp_path.unlink()
 
-Overall: A professional YouTube presentation image that combines engaging human elements with crystal-clear Chinese text rendering, leveraging Nano Banana Pro's superior multilingual typography to create an information-rich, visually striking image perfect for blockchain news presentation."""
+        except Exception as e:
+            self.logger.warning("PNG optimization skipped for %s: %s", image_path, e)
+            Path(f"{image_path}.tmp").unlink(missing_ok=True)
 
-            prompts.append({
-                'section': title,
-                'title': title,
-                'description': f"{title}的专业PPT风格可视化",
-                'prompt': prompt
-            })
+    def _image_cache_path(self, model: str, prompt: str) -> Path:
+        """Cache file path for a (model, prompt) pair"""
+        key = hashlib.sha256(f"{model}|{prompt}".encode('utf-8')).hexdigest()
+        return self.image_cache_dir / f"{key}.png"
 
-        return prompts
+    def _prune_image_cache(self):
+        """Evict expired entries and keep at most IMAGE_CACHE_MAX_ENTRIES newest images"""
+        try:
+            entries = []
+            for entry in os.scandir(self.image_cache_dir):
+                if entry.name.endswith('.png'):
+                    entries.append((entry.stat().st_mtime, entry.path))
+            entries.sort(reverse=True)
+
+            cutoff = time.time() - IMAGE_CACHE_TTL
+            stale = [
+                path for i, (mtime, path) in enumerate(entries)
+                if i >= IMAGE_CACHE_MAX_ENTRIES or mtime < cutoff
+            ]
+            for path in stale:
+                os.unlink(path)
+            if stale:
+                self.logger.info("Pruned %d image cache entries", len(stale))
+
+        except OSError as e:
+            self.logger.warning("Failed to prune image cache: %s", e)
+
+    def _is_cache_fresh(self, cache_path: Path) -> bool:
+        """Whether a cached image exists and is newer than IMAGE_CACHE_TTL"""
+        try:
+            return time.time() - cache_path.stat().st_mtime <= IMAGE_CACHE_TTL
+        except OSError:
+            return False
 
-    def _generate_single_image(self, prompt: str, use_cover_model: bool = False) -> bytes:
+    def _request_image(self, prompt: str, output_path: str, use_cover_model: bool = False) -> bool:
         """
-        Generate a single image using specified model
+        Call the image API for a single image and stream it to output_path
 
         Args:
             prompt: Image generation prompt
-            use_cover_model: If True, use premium Nano Banana Pro for cover;
-                           If False, use Gemini 2.5 Flash for content images
+            output_path: File to write the image to
+            use_cover_model: Whether to use the premium cover model
 
         Returns:
-            Image data as bytes, or None if failed
+            True if the image was written, False if failed
         """
+        # 先写临时文件再改名：output_path 可能是缓存文件的硬链接，原地写入会改掉缓存内容
+        tmp_path = f"{output_path}.part"
         try:
             # Select model based on image type
             model = self.cover_model if use_cover_model else self.content_model
             model_name = "Nano Banana Pro (Premium)" if use_cover_model else "Gemini 2.5 Flash (Free)"
 
-            self.logger.info(f"Generating image using {model_name}...")
-            self.logger.info(f"Prompt: {prompt[:100]}...")
+            self.logger.info("Generating image using %s...", model_name)
+            self.logger.info("Prompt: %.100s...", prompt)
 
             # Use raw requests API because OpenAI SDK doesn't parse images field correctly
-            import requests
-            import base64
-            import json
 
             headers = {
                 "Authorization": f"Bearer {OPENROUTER_API_KEY}",
@@ -426,18 +799,19 @@ Overall: A professional YouTube presentation image that combines engaging human
                 "temperature": 0.7
             }
 
-            response = requests.post(
-                OPENROUTER_BASE_URL + "/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=60
-            )
+            with self._request_slots:
+                response = self.http.post(
+                    self.api_url,
+                    headers=headers,
+                    data=dumps_json(data),
+                    timeout=60
+                )
 
             if response.status_code != 200:
-                self.logger.error(f"API error: {response.status_code} - {response.text}")
-                return None
+                self.logger.error("API error: %s - %s", response.status_code, response.text)
+                return False
 
-            result = response.json()
+            result = loads_json(response.content)
 
             # Check for images in response
             if 'choices' in result and len(result['choices']) > 0:
@@ -455,38 +829,52 @@ Overall: A professional YouTube presentation image that combines engaging human
                         if image_url.startswith('data:image'):
                             try:
                                 # Extract base64 data
-                                if 'base64,' in image_url:
-                                    base64_data = image_url.split('base64,')[1]
-                                    image_data = base64.b64decode(base64_data)
-                                    self.logger.info(f"✓ Decoded base64 image ({len(image_data)} bytes)")
-                                    return image_data
+                                # 只在数据头部查找标记，避免扫描整个多 MB 的字符串
+                                marker = image_url.find('base64,', 0, 64)
+                                if marker != -1:
+                                    # 分块解码写入，不在内存中保留整张解码后的图片
+                                    size = 0
+                                    with open(tmp_path, 'wb') as f:
+                                        for start in range(marker + 7, len(image_url), BASE64_CHUNK_CHARS):
+                                            size += f.write(base64.b64decode(image_url[start:start + BASE64_CHUNK_CHARS]))
+                                    os.replace(tmp_path, output_path)
+                                    self.logger.info("✓ Decoded base64 image (%d bytes)", size)
+                                    return True
                             except Exception as e:
-                                self.logger.error(f"Failed to decode base64: {e}")
-                                return None
+                                self.logger.error("Failed to decode base64: %s", e)
+                                # 分块解码可能在写入部分数据后失败，删除残缺的临时文件
+                                Path(tmp_path).unlink(missing_ok=True)
+                                return False
 
                         # Handle HTTP URL
                         elif image_url.startswith('http'):
                             self.logger.info("Downloading from URL...")
-                            img_response = requests.get(image_url, timeout=30)
-                            if img_response.status_code == 200:
-                                self.logger.info(f"✓ Downloaded image ({len(img_response.content)} bytes)")
-                                return img_response.content
+                            with self.http.get(image_url, stream=True, timeout=30) as img_response:
+                                if img_response.status_code == 200:
+                                    img_response.raw.decode_content = True
+                                    with open(tmp_path, 'wb') as f:
+                                        shutil.copyfileobj(img_response.raw, f, length=1024 * 1024)
+                                    os.replace(tmp_path, output_path)
+                                    self.logger.info("✓ Downloaded image (%d bytes)", os.path.getsize(output_path))
+                                    return True
+                                self.logger.error("Image download failed: HTTP %s", img_response.status_code)
+                                return False
 
             self.logger.warning("No image data found in response")
-            return None
+            return False
 
         except Exception as e:
-            self.logger.error(f"Error in image generation: {e}")
-            import traceback
-            self.logger.debug(traceback.format_exc())
-            return None
+            self.logger.error("Error in image generation: %s", e)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(traceback.format_exc())
+            # 避免留下写了一半的文件
+            Path(tmp_path).unlink(missing_ok=True)
+            return False
 
     def _sanitize_filename(self, name: str) -> str:
         """Sanitize filename"""
-        # Remove special characters
-        import re
-        name = re.sub(r'[^\w\s-]', '', name)
-        # Replace spaces with underscores
-        name = re.sub(r'[\s]+', '_', name)
+        # Remove special characters, then replace spaces with underscores
+        name = _SANITIZE_SPECIAL_RE.sub('', name)
+        name = _SANITIZE_SPACE_RE.sub('_', name)
         # Limit length
         return name[:50]
@@ -2,27 +2,74 @@
 PDF Generator - Create professional PDF reports with images
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+import re
+import tempfile
 from datetime import datetime
 import markdown
+from PIL import Image
 from weasyprint import HTML, CSS
 from weasyprint.text.fonts import FontConfiguration
 
+try:
+    # 直接把 PNG 数据流无损嵌入 PDF，无需 HTML 排版
+    import img2pdf
+except ImportError:
+    img2pdf = None
+
+try:
+    # 可选：libvips 流式缩放，比 Pillow 更快、占用内存更少（需要系统安装 libvips）
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
 from src.utils.logger import get_logger
 
 
+# PDF 中图片的最大尺寸（A4 横向约 210 dpi）
+PDF_IMAGE_MAX_SIZE = (2480, 1754)
+# 超过该大小的图片即使尺寸合适也转为 JPEG 嵌入
+PDF_JPEG_MIN_BYTES = 1024 * 1024
+
+# 正文中的二级标题（内容在同一行内）
+_H2_RE = re.compile(r'<h2[^>]*>(.*?)</h2>')
+
+# 纯图片 PDF 的 HTML 首尾（固定内容，预先编码为 UTF-8）
+_IMAGES_HTML_HEAD = b"""
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <title>Blockchain Daily Images</title>
+</head>
+<body>
+    """
+
+_IMAGES_HTML_TAIL = b"""
+</body>
+</html>
+"""
+
+
 class PDFGenerator:
     """Generate PDF reports from article content and images"""
 
     def __init__(self):
         self.logger = get_logger('pdf_generator')
+        # 字体配置与样式表只解析一次，多次生成 PDF 时复用
+        self._font_config = FontConfiguration()
+        self._images_css = CSS(string=self._create_images_only_css(), font_config=self._font_config)
 
     def generate_pdf(
         self,
         article_data: Dict[str, Any],
         images: List[Dict[str, Any]],
-        output_path: str
+        output_path: str,
+        use_fast_pdf: bool = True
     ) -> str:
         """
         Generate PDF report with ONLY images (no text content)
@@ -31,6 +78,8 @@ class PDFGenerator:
             article_data: Dict with title, content, description, tags (not used, kept for compatibility)
             images: List of image dicts with path, title, description
             output_path: Output PDF file path
+            use_fast_pdf: Pack images directly with img2pdf when available,
+                          falling back to WeasyPrint
 
         Returns:
             Path to generated PDF file
@@ -41,21 +90,15 @@ class PDFGenerator:
             if not images:
                 self.logger.warning("No images provided, creating empty PDF")
 
-            # Create simple HTML with only images
-            html_content = self._create_images_only_html(images)
-
             # Generate PDF
             output_file = Path(output_path)
             output_file.parent.mkdir(parents=True, exist_ok=True)
 
-            # Create minimal CSS for images
-            css = self._create_images_only_css()
-
-            # Generate PDF using WeasyPrint
-            HTML(string=html_content).write_pdf(
-                output_file,
-                stylesheets=[CSS(string=css)]
-            )
+            # 超大图片先缩放为 JPEG 临时副本再嵌入，原始 PNG 保持不变
+            with tempfile.TemporaryDirectory(prefix='pdf_images_') as tmp_dir:
+                # Sort images: cover first, then content images (by original path)
+                pdf_images = self._prepare_pdf_images(self._sort_images(images), Path(tmp_dir))
+                self._write_images_pdf(pdf_images, output_file, use_fast_pdf)
 
             self.logger.info(f"✓ Image-only PDF generated: {output_file}")
             return str(output_file)
@@ -66,44 +109,143 @@ class PDFGenerator:
             self.logger.debug(traceback.format_exc())
             raise
 
-    def _create_images_only_html(self, images: List[Dict[str, Any]]) -> str:
+    def _write_images_pdf(self, images: List[Dict[str, Any]], output_file: Path, use_fast_pdf: bool):
+        """Write the image-only PDF, with img2pdf when possible, else WeasyPrint"""
+        if use_fast_pdf and images and img2pdf is not None:
+            try:
+                self._generate_pdf_fast(images, output_file)
+                return
+            except Exception as e:
+                # 例如带透明通道的 PNG，img2pdf 无法无损嵌入，改用 WeasyPrint
+                self.logger.warning(f"Fast PDF packing failed, falling back to WeasyPrint: {e}")
+
+        # WeasyPrint 只作为兜底路径，且每日最多 7 张图片；分片到多进程渲染再合并
+        # 的进程启动和重复导入开销会超过渲染本身，因此保持单次渲染
+        # Create simple HTML with only images
+        html_content = self._create_images_only_html(images)
+
+        # Generate PDF using WeasyPrint
+        HTML(string=html_content, encoding='utf-8').write_pdf(
+            output_file,
+            stylesheets=[self._images_css],
+            font_config=self._font_config
+        )
+
+    def _prepare_pdf_images(self, images: List[Dict[str, Any]], tmp_dir: Path) -> List[Dict[str, Any]]:
         """
-        Create HTML with only images, one image per page
+        Replace oversized images with downsampled JPEG copies for PDF embedding
+
+        Images larger than the A4 landscape render size or PDF_JPEG_MIN_BYTES
+        are resized to fit PDF_IMAGE_MAX_SIZE and saved as progressive JPEG
+        in tmp_dir. Other images are used as-is.
 
         Args:
             images: List of image dicts with path
+            tmp_dir: Directory for the JPEG copies
 
         Returns:
-            HTML string
+            Image dicts with path pointing at the file to embed
         """
-        # Sort images: cover first, then content images
-        sorted_images = sorted(images, key=lambda x: (not x.get('is_cover', False), x.get('path', '')))
+        def prepare(job):
+            i, img = job
+            jpeg_path = self._downsample_image(img['path'], tmp_dir / f"{i:02d}.jpg")
+            return {**img, 'path': jpeg_path} if jpeg_path else img
 
-        # Build HTML with one image per page
-        image_html_parts = []
-        for img in sorted_images:
-            img_path = Path(img['path']).resolve()
+        # Pillow / libvips 解码编码时释放 GIL，多张图片可并行处理
+        with ThreadPoolExecutor(max_workers=min(len(images), os.cpu_count() or 1) or 1) as executor:
+            return list(executor.map(prepare, enumerate(images)))
+
+    def _downsample_image(self, image_path: str, jpeg_path: Path) -> Optional[str]:
+        """Save an oversized image as a resized JPEG, or return None to keep the original"""
+        try:
+            if pyvips is not None:
+                try:
+                    return self._downsample_image_vips(image_path, jpeg_path)
+                except pyvips.Error as e:
+                    # libvips 缺少对应格式的 loader 等情况，回退到 Pillow
+                    self.logger.debug(f"libvips failed on {image_path}, falling back to Pillow: {e}")
+
+            with Image.open(image_path) as im:
+                if not self._is_oversized(image_path, im.width, im.height):
+                    return None
+                im.thumbnail(PDF_IMAGE_MAX_SIZE, Image.LANCZOS)
+                im.convert('RGB').save(jpeg_path, 'JPEG', quality=85, progressive=True, optimize=True)
+            return str(jpeg_path)
+
+        except Exception as e:
+            self.logger.warning(f"Keeping original image for PDF ({image_path}): {e}")
+            return None
+
+    def _downsample_image_vips(self, image_path: str, jpeg_path: Path) -> Optional[str]:
+        """libvips version of _downsample_image: streams the file instead of decoding it whole"""
+        im = pyvips.Image.new_from_file(image_path, access='sequential')
+        if not self._is_oversized(image_path, im.width, im.height):
+            return None
+        im = pyvips.Image.thumbnail(image_path, PDF_IMAGE_MAX_SIZE[0], height=PDF_IMAGE_MAX_SIZE[1], size='down')
+        if im.hasalpha():
+            im = im.extract_band(0, n=im.bands - 1)
+        im.jpegsave(str(jpeg_path), Q=85, interlace=True, optimize_coding=True, strip=True)
+        return str(jpeg_path)
+
+    @staticmethod
+    def _is_oversized(image_path: str, width: int, height: int) -> bool:
+        """Whether an image exceeds the PDF render size or PDF_JPEG_MIN_BYTES"""
+        return (os.path.getsize(image_path) >= PDF_JPEG_MIN_BYTES
+                or width > PDF_IMAGE_MAX_SIZE[0] or height > PDF_IMAGE_MAX_SIZE[1])
+
+    def _generate_pdf_fast(self, images: List[Dict[str, Any]], output_file: Path):
+        """
+        Pack images into an A4 landscape PDF, one per page, without re-encoding
+
+        Pages are filled edge to edge keeping the aspect ratio, matching the
+        object-fit: cover layout of the WeasyPrint path.
+
+        Args:
+            images: List of image dicts with path, in page order
+            output_file: Output PDF file path
+        """
+        layout = img2pdf.get_layout_fun(
+            pagesize=(img2pdf.mm_to_pt(297), img2pdf.mm_to_pt(210)),
+            fit=img2pdf.FitMode.fill
+        )
+        image_paths = [img['path'] for img in images]
+        output_file.write_bytes(img2pdf.convert(image_paths, layout_fun=layout))
+
+    @staticmethod
+    def _sort_images(images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sort images: cover first, then content images by path"""
+        return sorted(images, key=lambda x: (not x.get('is_cover', False), x.get('path', '')))
+
+    def _create_images_only_html(self, images: List[Dict[str, Any]]) -> bytes:
+        """
+        Create HTML with only images, one image per page
+
+        Args:
+            images: List of image dicts with path, in page order
+
+        Returns:
+            UTF-8 encoded HTML
+        """
+        # Build HTML with one image per page, written straight into a byte buffer
+        buf = io.BytesIO()
+        buf.write(_IMAGES_HTML_HEAD)
+        # 同一天的图片都在同一目录下，每个目录只 resolve 一次
+        resolved_dirs = {}
+        for img in images:
+            path = Path(img['path'])
+            parent = resolved_dirs.get(path.parent)
+            if parent is None:
+                parent = resolved_dirs[path.parent] = path.parent.resolve()
+            img_path = parent / path.name
 
             # Each image on its own page
-            image_html_parts.append(f'''
+            buf.write(f'''
                 <div class="image-page">
                     <img src="file://{img_path}" alt="Generated Image">
                 </div>
-            ''')
-
-        html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <title>Blockchain Daily Images</title>
-</head>
-<body>
-    {''.join(image_html_parts)}
-</body>
-</html>
-"""
-        return html
+            '''.encode('utf-8'))
+        buf.write(_IMAGES_HTML_TAIL)
+        return buf.getvalue()
 
     def _create_images_only_css(self) -> str:
         """
@@ -237,35 +379,36 @@ class PDFGenerator:
                     section_images[section] = []
                 section_images[section].append(img)
 
-        # Insert images after their corresponding section headers
-        result = html_content
-
-        for section_title, imgs in section_images.items():
-            # Find the section header in HTML
-            # Look for <h2> tags containing the section title
-            import re
+        # Single pass over the h2 tags: each section's images go after the
+        # first h2 whose text contains the section title
+        pending = dict(section_images)
+
+        def insert_images(match):
+            header = match.group(0)
+            if not pending:
+                return header
+            matched = [title for title in pending if title in match.group(1)]
+            # Later sections sharing a header are inserted closest to it
+            return header + ''.join(
+                f'\n{self._section_images_html(pending.pop(title))}\n'
+                for title in reversed(matched)
+            )
 
-            # Match h2 tags with the section title
-            pattern = f'(<h2[^>]*>.*?{re.escape(section_title)}.*?</h2>)'
+        return _H2_RE.sub(insert_images, html_content)
 
-            def replace_with_image(match):
-                header = match.group(0)
-                # Add images after the header
-                images_html = '\n'.join([
-                    f'''
+    @staticmethod
+    def _section_images_html(imgs: List[Dict[str, Any]]) -> str:
+        """HTML blocks for the images of one section"""
+        return '\n'.join([
+            f'''
                     <div class="image-container">
                         <img src="file://{img["path"]}" alt="{img["title"]}" />
                         <p class="image-caption">{img["title"]}</p>
                         <p class="image-description">{img["description"]}</p>
                     </div>
                     '''
-                    for img in imgs
-                ])
-                return f'{header}\n{images_html}\n'
-
-            result = re.sub(pattern, replace_with_image, result, count=1)
-
-        return result
+            for img in imgs
+        ])
 
     def _generate_toc(self, markdown_content: str) -> str:
         """Generate table of contents from markdown headers"""
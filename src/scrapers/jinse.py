@@ -3,10 +3,11 @@ Jin Se (金色财经) scraper
 """
 
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from .base import BaseScraper
 from src.config import NEWS_SOURCES
+from src.utils.helpers import extract_title
 
 class JinSeScraper(BaseScraper):
     """Scraper for Jin Se (金色财经)"""
@@ -15,6 +16,7 @@ class JinSeScraper(BaseScraper):
         super().__init__('金色财经')
         self.api_url = NEWS_SOURCES['jinse']['api_url']
         self.limit = NEWS_SOURCES['jinse'].get('limit', 100)
+        self.page_size = NEWS_SOURCES['jinse'].get('page_size', 20)
         self.headers['Referer'] = 'https://www.jinse.cn/'
 
     def fetch_news(self, hours: int = 24) -> List[Dict[str, Any]]:
@@ -30,17 +32,21 @@ class JinSeScraper(BaseScraper):
         try:
             self.logger.info(f"Fetching Jin Se news from past {hours} hours...")
 
-            all_lives = []
+            filtered_news = []
+            total_items = 0
             current_id = 0
             page = 1
-            max_pages = (self.limit + 19) // 20  # 计算需要的页数 (每页20条)
+            # 抓取总量按 20 条一页向上取整（与原分页行为一致），每次请求尽量多取以减少往返
+            max_items = (self.limit + 19) // 20 * 20
 
-            # 用于提前终止的时间检查
-            cutoff_time = self._get_cutoff_time(hours)
+            # 截止时间转为时间戳，直接与 created_at（秒级整数）比较
+            cutoff_ts = self._get_cutoff_time(hours).timestamp()
 
-            while page <= max_pages:
+            # 分页基于游标（上一页最后一条的 id），id 不连续，无法预测后续页的游标并行请求；
+            # 猜错会静默漏掉快讯，因此保持顺序分页（与其他新闻源的抓取并行进行）
+            while total_items < max_items:
                 params = {
-                    'limit': 20,  # 每页20条
+                    'limit': min(self.page_size, max_items - total_items),
                     'reading': 'false',
                     'source': 'web',
                     'flag': 'down',
@@ -57,79 +63,49 @@ class JinSeScraper(BaseScraper):
                         self.logger.info(f"No more data at page {page}")
                         break
 
-                    page_lives = []
-                    oldest_time = None
+                    page_count = 0
+                    last_id = None
+                    oldest_ts = None
 
+                    # 分页扫描与过滤合并为一次遍历
                     for item in items:
-                        lives = item.get('lives', [])
-                        for live in lives:
+                        for live in item.get('lives', []):
+                            page_count += 1
+                            last_id = live.get('id')
                             created_at = live.get('created_at')
-                            if created_at:
-                                news_time = datetime.fromtimestamp(created_at, tz=self.tz)
-                                if oldest_time is None or news_time < oldest_time:
-                                    oldest_time = news_time
-                            page_lives.append(live)
-
-                    if not page_lives:
+                            if not created_at:
+                                continue
+                            if oldest_ts is None or created_at < oldest_ts:
+                                oldest_ts = created_at
+                            if created_at < cutoff_ts:
+                                continue
+
+                            news_item = self._parse_live(live, created_at)
+                            if news_item:
+                                filtered_news.append(news_item)
+
+                    if not page_count:
                         break
 
+                    total_items += page_count
+
                     # 如果本页最旧的新闻已经超出时间范围，可以提前终止
-                    if oldest_time and oldest_time < cutoff_time:
+                    if oldest_ts is not None and oldest_ts < cutoff_ts:
                         self.logger.info(f"Reached time limit at page {page}")
-                        all_lives.extend(page_lives)
                         break
 
                     # 更新current_id为最后一条的ID，用于下一页
-                    last_id = page_lives[-1].get('id')
                     if last_id:
                         current_id = last_id
 
-                    all_lives.extend(page_lives)
-                    self.logger.debug(f"Page {page}: fetched {len(page_lives)} items (total: {len(all_lives)})")
+                    self.logger.debug(f"Page {page}: fetched {page_count} items (total: {total_items})")
                     page += 1
 
                 except Exception as e:
                     self.logger.warning(f"Error fetching page {page}: {e}")
                     break
 
-            self.logger.info(f"Fetched {len(all_lives)} total items from {page-1} pages")
-
-            # 处理和过滤新闻
-            filtered_news = []
-            for live in all_lives:
-                try:
-                    created_at = live.get('created_at')
-                    if not created_at:
-                        continue
-
-                    news_time = datetime.fromtimestamp(created_at, tz=self.tz)
-
-                    if not self._is_within_timeframe(news_time, hours):
-                        continue
-
-                    content = live.get('content', '').strip()
-                    if not content:
-                        continue
-
-                    # Use content_prefix as title if available
-                    title = live.get('content_prefix', '').strip()
-                    if not title:
-                        from src.utils.helpers import extract_title
-                        title = extract_title(content)
-
-                    news_item = self._format_news_item(
-                        title=title,
-                        content=content,
-                        link=f"https://www.jinse.cn/lives/{live.get('id')}",
-                        published_at=news_time,
-                        grade=live.get('grade', 0)
-                    )
-
-                    filtered_news.append(news_item)
-
-                except Exception as e:
-                    self.logger.warning(f"Error parsing Jin Se news item: {e}")
-                    continue
+            self.logger.info(f"Fetched {total_items} total items from {page-1} pages")
 
             self.logger.info(f"Successfully fetched {len(filtered_news)} Jin Se news items within {hours} hours")
             return filtered_news
@@ -137,3 +113,37 @@ class JinSeScraper(BaseScraper):
         except Exception as e:
             self.logger.error(f"Unexpected error in Jin Se scraper: {e}")
             return []
+
+    def _parse_live(self, live: Dict[str, Any], created_at: int) -> Optional[Dict[str, Any]]:
+        """
+        Convert a Jin Se live item into a news item
+
+        Args:
+            live: Raw live item from the API
+            created_at: Publication epoch seconds
+
+        Returns:
+            News item dict, or None if the item has no content
+        """
+        try:
+            content = live.get('content', '').strip()
+            if not content:
+                return None
+
+            # Use content_prefix as title if available
+            title = live.get('content_prefix', '').strip()
+            if not title:
+                title = extract_title(content)
+
+            return self._format_news_item(
+                title=title,
+                content=content,
+                link=f"https://www.jinse.cn/lives/{live.get('id')}",
+                published_at=datetime.fromtimestamp(created_at, tz=self.tz),
+                timestamp=int(created_at),
+                grade=live.get('grade', 0)
+            )
+
+        except Exception as e:
+            self.logger.warning(f"Error parsing Jin Se news item: {e}")
+            return None
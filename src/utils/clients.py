@@ -0,0 +1,104 @@
+"""
+Shared HTTP / API clients
+
+Clients are cached per configuration so every module reuses the same
+connection pool (TCP + TLS sessions) instead of reconnecting per call.
+"""
+
+import functools
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def _has_h2() -> bool:
+    """Whether the optional h2 package needed for httpx HTTP/2 is installed"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+@functools.lru_cache(maxsize=4)
+def get_openai_client(base_url: str, api_key: str, timeout: float):
+    """
+    Get a shared OpenAI-compatible client for the given config
+
+    Args:
+        base_url: API base URL
+        api_key: API key
+        timeout: Request timeout in seconds
+
+    Returns:
+        OpenAI client instance
+    """
+    from openai import OpenAI
+
+    # 创建不带代理的 httpx client
+    import httpx
+    http_client = httpx.Client(
+        base_url=base_url,
+        timeout=timeout,
+        # HTTP/2 在同一条 TLS 连接上多路复用并发请求（需要安装 h2）
+        http2=_has_h2(),
+        # 空闲连接保持 120 秒，突发请求时复用已建立的 TLS 连接
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=120.0)
+    )
+
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=http_client
+    )
+
+
+class _RetryPolicy(Retry):
+    """Retry that re-sends non-idempotent POSTs only when the server refused them"""
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        # POST（如付费的图片生成）在 5xx / 读超时时可能已被处理并计费，只对 429 重发
+        if method and method.upper() == 'POST':
+            return status_code == 429 and bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+@functools.lru_cache(maxsize=1)
+def get_http_session(pool_size: int = 32) -> requests.Session:
+    """
+    Get a shared pooled requests session
+
+    GET requests retry transient failures (429 / 5xx, connection and read
+    errors) up to 5 times with jittered exponential backoff (capped at 30s)
+    and honour Retry-After headers. POST requests are only retried on
+    connection errors and 429, never after they may have been processed.
+
+    Args:
+        pool_size: Max pooled connections per host
+
+    Returns:
+        requests.Session instance
+    """
+    retry_kwargs = dict(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # 读超时只对幂等方法重试；POST 的状态码重试由 _RetryPolicy 单独判断
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    try:
+        # 指数退避 + 随机抖动，避免并发请求同时重试
+        retry = _RetryPolicy(**retry_kwargs, backoff_jitter=1.0, backoff_max=30)
+    except TypeError:
+        # urllib3 < 2.0 不支持 backoff_jitter / backoff_max
+        retry = _RetryPolicy(**retry_kwargs)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.headers['Connection'] = 'keep-alive'
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -2,10 +2,13 @@
 Email Sender - Send PDF reports via email
 """
 
+import base64
 import smtplib
+import ssl
+import string
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
+from email.mime.base import MIMEBase
 from pathlib import Path
 from typing import List
 import zipfile
@@ -22,195 +25,48 @@ from src.config import (
 from src.utils.logger import get_logger
 
 
-class EmailSender:
-    """Send emails with PDF attachments"""
-
-    def __init__(self):
-        self.logger = get_logger('email_sender')
-
-        # Validate configuration
-        if not all([EMAIL_SMTP_SERVER, EMAIL_USERNAME, EMAIL_PASSWORD, EMAIL_FROM, EMAIL_TO]):
-            raise ValueError(
-                "Email configuration incomplete. Please set: "
-                "EMAIL_SMTP_SERVER, EMAIL_USERNAME, EMAIL_PASSWORD, EMAIL_FROM, EMAIL_TO"
-            )
-
-        self.smtp_server = EMAIL_SMTP_SERVER
-        self.smtp_port = EMAIL_SMTP_PORT
-        self.username = EMAIL_USERNAME
-        self.password = EMAIL_PASSWORD
-        self.from_email = EMAIL_FROM
-        self.to_emails = EMAIL_TO if isinstance(EMAIL_TO, list) else [EMAIL_TO]
-
-        self.logger.info(f"Email sender initialized (SMTP: {self.smtp_server}:{self.smtp_port})")
-
-    def send_daily_report(
-        self,
-        pdf_path: str,
-        date_str: str,
-        article_title: str,
-        article_description: str,
-        num_news: int,
-        num_images: int,
-        images_dir: str = None
-    ) -> bool:
-        """
-        Send daily report email with PDF and images zip attachment
-
-        Args:
-            pdf_path: Path to PDF file
-            date_str: Date string (YYYY-MM-DD)
-            article_title: Article title
-            article_description: Article description
-            num_news: Number of news items
-            num_images: Number of images generated
-            images_dir: Directory containing images (optional)
-
-        Returns:
-            True if sent successfully, False otherwise
-        """
-        try:
-            self.logger.info(f"Sending daily report to {len(self.to_emails)} recipient(s)...")
-
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = ', '.join(self.to_emails)
-            msg['Subject'] = f"区块链每日观察 - {date_str}"
-
-            # Create email body
-            body = self._create_email_body(
-                date_str,
-                article_title,
-                article_description,
-                num_news,
-                num_images
-            )
+ATTACHMENT_CHUNK_BYTES = 57 * 1024  # 附件分块编码大小（base64 每行 57 字节）
 
-            msg.attach(MIMEText(body, 'html', 'utf-8'))
-
-            # Attach PDF
-            pdf_file = Path(pdf_path)
-            if pdf_file.exists():
-                with open(pdf_file, 'rb') as f:
-                    pdf_attachment = MIMEApplication(f.read(), _subtype='pdf')
-                    pdf_attachment.add_header(
-                        'Content-Disposition',
-                        'attachment',
-                        filename=pdf_file.name
-                    )
-                    msg.attach(pdf_attachment)
-                self.logger.info(f"Attached PDF: {pdf_file.name} ({pdf_file.stat().st_size / 1024 / 1024:.2f} MB)")
-            else:
-                self.logger.error(f"PDF file not found: {pdf_path}")
-                return False
-
-            # Create and attach images zip
-            if images_dir:
-                zip_path = self._create_images_zip(images_dir, date_str)
-                if zip_path and Path(zip_path).exists():
-                    with open(zip_path, 'rb') as f:
-                        zip_attachment = MIMEApplication(f.read(), _subtype='zip')
-                        zip_attachment.add_header(
-                            'Content-Disposition',
-                            'attachment',
-                            filename=f'blockchain-images-{date_str}.zip'
-                        )
-                        msg.attach(zip_attachment)
-                    self.logger.info(f"Attached ZIP: blockchain-images-{date_str}.zip ({Path(zip_path).stat().st_size / 1024 / 1024:.2f} MB)")
-                else:
-                    self.logger.warning("Failed to create images zip, continuing without it")
-
-            # Send email (support both TLS and SSL)
-            if self.smtp_port == 465:
-                # Use SSL for port 465 (QQ Mail, etc.)
-                import ssl
-                context = ssl.create_default_context()
-
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=context) as server:
-                    self.logger.debug("SSL connection established")
-
-                    # Enable debug output
-                    server.set_debuglevel(0)
-
-                    # Login
-                    server.login(self.username, self.password)
-                    self.logger.debug("Logged in successfully")
-
-                    # Send
-                    server.send_message(msg)
-                    self.logger.info(f"✓ Email sent successfully to: {', '.join(self.to_emails)}")
-            else:
-                # Use STARTTLS for port 587 (Gmail, etc.)
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    # Enable TLS
-                    server.starttls()
-                    self.logger.debug("TLS enabled")
-
-                    # Login
-                    server.login(self.username, self.password)
-                    self.logger.debug("Logged in successfully")
-
-                    # Send
-                    server.send_message(msg)
-                    self.logger.info(f"✓ Email sent successfully to: {', '.join(self.to_emails)}")
-
-            return True
-
-        except Exception as e:
-            self.logger.error(f"Failed to send email: {e}")
-            import traceback
-            self.logger.debug(traceback.format_exc())
-            return False
-
-    def _create_email_body(
-        self,
-        date_str: str,
-        title: str,
-        description: str,
-        num_news: int,
-        num_images: int
-    ) -> str:
-        """Create HTML email body"""
 
-        return f"""
+# 日报邮件 HTML 模板（静态内容只在导入时构建一次）
+_REPORT_EMAIL_TEMPLATE = string.Template("""
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <style>
-        body {{
+        body {
             font-family: 'SimSun', 'STSong', Arial, sans-serif;
             line-height: 1.6;
             color: #333;
             max-width: 600px;
             margin: 0 auto;
             padding: 20px;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
             text-align: center;
             border-radius: 10px 10px 0 0;
-        }}
-        .header h1 {{
+        }
+        .header h1 {
             margin: 0;
             font-size: 24px;
-        }}
-        .header .date {{
+        }
+        .header .date {
             margin-top: 10px;
             font-size: 14px;
             opacity: 0.9;
-        }}
-        .content {{
+        }
+        .content {
             background: white;
             padding: 30px;
             border-left: 1px solid #ddd;
             border-right: 1px solid #ddd;
-        }}
-        .description {{
+        }
+        .description {
             font-size: 16px;
             line-height: 1.8;
             margin-bottom: 20px;
@@ -218,42 +74,42 @@ class EmailSender:
             background: #f8f9fa;
             border-left: 4px solid #667eea;
             border-radius: 4px;
-        }}
-        .stats {{
+        }
+        .stats {
             display: flex;
             justify-content: space-around;
             margin: 30px 0;
-        }}
-        .stat {{
+        }
+        .stat {
             text-align: center;
             flex: 1;
-        }}
-        .stat-number {{
+        }
+        .stat-number {
             font-size: 36px;
             font-weight: bold;
             color: #667eea;
-        }}
-        .stat-label {{
+        }
+        .stat-label {
             font-size: 14px;
             color: #666;
             margin-top: 5px;
-        }}
-        .attachment {{
+        }
+        .attachment {
             background: #f8f9fa;
             padding: 20px;
             border-radius: 8px;
             margin-top: 20px;
             text-align: center;
-        }}
-        .attachment-icon {{
+        }
+        .attachment-icon {
             font-size: 48px;
             margin-bottom: 10px;
-        }}
-        .attachment-text {{
+        }
+        .attachment-text {
             color: #666;
             font-size: 14px;
-        }}
-        .footer {{
+        }
+        .footer {
             background: #f8f9fa;
             padding: 20px;
             text-align: center;
@@ -264,12 +120,12 @@ class EmailSender:
             border-left: 1px solid #ddd;
             border-right: 1px solid #ddd;
             border-bottom: 1px solid #ddd;
-        }}
-        .footer a {{
+        }
+        .footer a {
             color: #667eea;
             text-decoration: none;
-        }}
-        .button {{
+        }
+        .button {
             display: inline-block;
             padding: 12px 30px;
             background: #667eea;
@@ -278,29 +134,29 @@ class EmailSender:
             border-radius: 5px;
             margin: 20px 0;
             font-weight: bold;
-        }}
+        }
     </style>
 </head>
 <body>
     <div class="header">
         <h1>📊 区块链每日观察</h1>
-        <div class="date">{date_str}</div>
+        <div class="date">${date_str}</div>
     </div>
 
     <div class="content">
         <h2 style="color: #667eea; margin-top: 0;">今日报告已生成</h2>
 
         <div class="description">
-            {description}
+            ${description}
         </div>
 
         <div class="stats">
             <div class="stat">
-                <div class="stat-number">{num_news}</div>
+                <div class="stat-number">${num_news}</div>
                 <div class="stat-label">新闻条数</div>
             </div>
             <div class="stat">
-                <div class="stat-number">{num_images}</div>
+                <div class="stat-number">${num_images}</div>
                 <div class="stat-label">配图张数</div>
             </div>
         </div>
@@ -341,7 +197,232 @@ class EmailSender:
     </div>
 </body>
 </html>
-"""
+""")
+
+# 测试邮件 HTML 模板
+_TEST_EMAIL_TEMPLATE = string.Template("""
+<html>
+<body style="font-family: Arial, sans-serif; padding: 20px;">
+    <h2 style="color: #667eea;">✓ 邮件配置测试成功</h2>
+    <p>${test_message}</p>
+    <p style="color: #666; font-size: 14px; margin-top: 30px;">
+        SMTP 服务器: ${smtp_server}:${smtp_port}<br>
+        发件人: ${from_email}<br>
+        收件人: ${to_emails}
+    </p>
+</body>
+</html>
+""")
+
+
+class EmailSender:
+    """Send emails with PDF attachments"""
+
+    def __init__(self):
+        self.logger = get_logger('email_sender')
+
+        # Validate configuration
+        if not all([EMAIL_SMTP_SERVER, EMAIL_USERNAME, EMAIL_PASSWORD, EMAIL_FROM, EMAIL_TO]):
+            raise ValueError(
+                "Email configuration incomplete. Please set: "
+                "EMAIL_SMTP_SERVER, EMAIL_USERNAME, EMAIL_PASSWORD, EMAIL_FROM, EMAIL_TO"
+            )
+
+        self.smtp_server = EMAIL_SMTP_SERVER
+        self.smtp_port = EMAIL_SMTP_PORT
+        self.username = EMAIL_USERNAME
+        self.password = EMAIL_PASSWORD
+        self.from_email = EMAIL_FROM
+        self.to_emails = EMAIL_TO if isinstance(EMAIL_TO, list) else [EMAIL_TO]
+
+        # 已登录的 SMTP 连接，多次发送时复用（TLS 握手和登录只做一次）
+        self._smtp = None
+
+        self.logger.info(f"Email sender initialized (SMTP: {self.smtp_server}:{self.smtp_port})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the cached SMTP connection, if any"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        finally:
+            self._smtp = None
+
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Get a logged-in SMTP connection, opening one if needed
+
+        Returns:
+            Connected and authenticated SMTP client
+        """
+        if self._smtp is not None:
+            return self._smtp
+
+        # Support both TLS and SSL
+        if self.smtp_port == 465:
+            # Use SSL for port 465 (QQ Mail, etc.)
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=ssl.create_default_context())
+            self.logger.debug("SSL connection established")
+        else:
+            # Use STARTTLS for port 587 (Gmail, etc.)
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            server.starttls()
+            self.logger.debug("TLS enabled")
+
+        try:
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.logger.debug("Logged in successfully")
+
+        self._smtp = server
+        return server
+
+    def _send(self, msg):
+        """Send a message, reconnecting once if the cached connection went stale"""
+        try:
+            self._connect().send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # 空闲连接被服务器关闭，重新连接后重试一次
+            self.logger.debug("SMTP connection lost, reconnecting")
+            stale, self._smtp = self._smtp, None
+            if stale is not None:
+                # 对端已断开，发送 QUIT 会失败，直接关闭本地 socket
+                try:
+                    stale.close()
+                except (smtplib.SMTPException, OSError):
+                    pass
+            self._connect().send_message(msg)
+
+    def send_daily_report(
+        self,
+        pdf_path: str,
+        date_str: str,
+        article_title: str,
+        article_description: str,
+        num_news: int,
+        num_images: int,
+        images_dir: str = None
+    ) -> bool:
+        """
+        Send daily report email with PDF and images zip attachment
+
+        Args:
+            pdf_path: Path to PDF file
+            date_str: Date string (YYYY-MM-DD)
+            article_title: Article title
+            article_description: Article description
+            num_news: Number of news items
+            num_images: Number of images generated
+            images_dir: Directory containing images (optional)
+
+        Returns:
+            True if sent successfully, False otherwise
+        """
+        try:
+            self.logger.info(f"Sending daily report to {len(self.to_emails)} recipient(s)...")
+
+            # Create message
+            msg = MIMEMultipart()
+            msg['From'] = self.from_email
+            msg['To'] = ', '.join(self.to_emails)
+            msg['Subject'] = f"区块链每日观察 - {date_str}"
+
+            # Create email body
+            body = self._create_email_body(
+                date_str,
+                article_title,
+                article_description,
+                num_news,
+                num_images
+            )
+
+            msg.attach(MIMEText(body, 'html', 'utf-8'))
+
+            # Attach PDF
+            pdf_file = Path(pdf_path)
+            if pdf_file.exists():
+                msg.attach(self._file_attachment(pdf_file, 'pdf', pdf_file.name))
+                self.logger.info(f"Attached PDF: {pdf_file.name} ({pdf_file.stat().st_size / 1024 / 1024:.2f} MB)")
+            else:
+                self.logger.error(f"PDF file not found: {pdf_path}")
+                return False
+
+            # Create and attach images zip
+            if images_dir:
+                zip_path = self._create_images_zip(images_dir, date_str)
+                if zip_path and Path(zip_path).exists():
+                    msg.attach(self._file_attachment(zip_path, 'zip', f'blockchain-images-{date_str}.zip'))
+                    self.logger.info(f"Attached ZIP: blockchain-images-{date_str}.zip ({Path(zip_path).stat().st_size / 1024 / 1024:.2f} MB)")
+                else:
+                    self.logger.warning("Failed to create images zip, continuing without it")
+
+            # Send email (reuses the logged-in SMTP session if one is open)
+            self._send(msg)
+            self.logger.info(f"✓ Email sent successfully to: {', '.join(self.to_emails)}")
+
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to send email: {e}")
+            import traceback
+            self.logger.debug(traceback.format_exc())
+            return False
+
+    def _file_attachment(self, file_path, subtype: str, filename: str) -> MIMEBase:
+        """
+        Build a base64 attachment part, encoding the file chunk by chunk
+
+        The raw file is never held in memory as a whole; only its base64
+        text is, which is what the message needs anyway.
+
+        Args:
+            file_path: File to attach
+            subtype: MIME subtype under application/
+            filename: Attachment file name
+
+        Returns:
+            MIME part ready to attach
+        """
+        with open(file_path, 'rb') as f:
+            # 57 字节的整数倍，分块编码后的换行位置与一次性编码完全一致
+            encoded = ''.join(
+                base64.encodebytes(chunk).decode('ascii')
+                for chunk in iter(lambda: f.read(ATTACHMENT_CHUNK_BYTES), b'')
+            )
+
+        part = MIMEBase('application', subtype)
+        part.set_payload(encoded)
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        return part
+
+    def _create_email_body(
+        self,
+        date_str: str,
+        title: str,
+        description: str,
+        num_news: int,
+        num_images: int
+    ) -> str:
+        """Create HTML email body"""
+
+        return _REPORT_EMAIL_TEMPLATE.substitute(
+            date_str=date_str,
+            description=description,
+            num_news=num_news,
+            num_images=num_images
+        )
 
     def send_test_email(self, test_message: str = "这是一封测试邮件") -> bool:
         """
@@ -361,31 +442,17 @@ class EmailSender:
             msg['To'] = ', '.join(self.to_emails)
             msg['Subject'] = "测试邮件 - 区块链每日观察系统"
 
-            body = f"""
-<html>
-<body style="font-family: Arial, sans-serif; padding: 20px;">
-    <h2 style="color: #667eea;">✓ 邮件配置测试成功</h2>
-    <p>{test_message}</p>
-    <p style="color: #666; font-size: 14px; margin-top: 30px;">
-        SMTP 服务器: {self.smtp_server}:{self.smtp_port}<br>
-        发件人: {self.from_email}<br>
-        收件人: {', '.join(self.to_emails)}
-    </p>
-</body>
-</html>
-"""
+            body = _TEST_EMAIL_TEMPLATE.substitute(
+                test_message=test_message,
+                smtp_server=self.smtp_server,
+                smtp_port=self.smtp_port,
+                from_email=self.from_email,
+                to_emails=', '.join(self.to_emails)
+            )
 
             msg.attach(MIMEText(body, 'html', 'utf-8'))
 
-            if self.smtp_port == 465:
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                    server.login(self.username, self.password)
-                    server.send_message(msg)
-            else:
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    server.starttls()
-                    server.login(self.username, self.password)
-                    server.send_message(msg)
+            self._send(msg)
 
             self.logger.info("✓ Test email sent successfully")
             return True
@@ -2,8 +2,89 @@
 Helper utility functions
 """
 
+import json
+import os
 import re
-from typing import List, Dict, Any
+import shutil
+from pathlib import Path
+from typing import List, Dict, Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# HTML 标签
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON, using orjson when available
+
+    Args:
+        data: JSON text or UTF-8 bytes
+
+    Returns:
+        Parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps_json(obj: Any) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes, using orjson when available
+
+    Args:
+        obj: Object to serialize
+
+    Returns:
+        JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def _copy_file_range(src: Union[str, Path], dst: Union[str, Path]) -> bool:
+    """
+    Copy a file entirely in the kernel with copy_file_range (Linux)
+
+    Args:
+        src: Source file
+        dst: Destination path
+
+    Returns:
+        True if copied, False if unsupported (caller should fall back)
+    """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            # 返回 0 表示已到文件末尾；支持 reflink 的文件系统（btrfs/XFS）上不复制数据块
+            while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                pass
+        except OSError:
+            # EXDEV / ENOSYS / EINVAL 等：内核或文件系统不支持
+            return False
+    return True
+
+def link_or_copy(src: Union[str, Path], dst: Union[str, Path]):
+    """
+    Hard-link src to dst (no data copied), falling back to a file copy
+
+    An existing dst is replaced.
+
+    Args:
+        src: Source file
+        dst: Destination path
+    """
+    Path(dst).unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        # 跨文件系统或不支持硬链接时退回到内核复制，再不行用 copyfile（Linux 上走 sendfile）
+        if not _copy_file_range(src, dst):
+            shutil.copyfile(src, dst)
 
 def clean_text(text: str) -> str:
     """
@@ -18,16 +99,12 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
 
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-
-    # Remove special characters
-    text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+    # Remove HTML tags (纯文本无需走正则)
+    if '<' in text:
+        text = _HTML_TAG_RE.sub('', text)
 
-    return text.strip()
+    # Remove extra whitespace; split() 同时去掉 \n \r \t，结果首尾无空白
+    return ' '.join(text.split())
 
 def extract_title(content: str, max_length: int = 60) -> str:
     """
@@ -43,11 +120,13 @@ def extract_title(content: str, max_length: int = 60) -> str:
     # Clean content first
     content = clean_text(content)
 
-    # Try to get first sentence
-    if '。' in content:
-        title = content.split('。')[0] + '。'
-    elif '.' in content and len(content.split('.')[0]) < max_length:
-        title = content.split('.')[0] + '.'
+    # Try to get first sentence（find 定位句号，不拆分整段正文）
+    period = content.find('。')
+    dot = content.find('.') if period == -1 else -1
+    if period != -1:
+        title = content[:period + 1]
+    elif dot != -1 and dot < max_length:
+        title = content[:dot + 1]
     else:
         title = content[:max_length]
 
@@ -70,16 +149,21 @@ def deduplicate_news(news_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     if not news_list:
         return []
 
-    seen_contents = set()
+    # 只保存键的 64 位哈希（SipHash），不保留每条新闻的前缀字符串
+    seen_hashes = set()
     unique_news = []
 
     for news in news_list:
         # Use first 100 characters of content as dedup key
+        # （切片后只对 100 字做一次 lower；不用 casefold，以免改变去重判定，如 ß/ss）
         content = news.get('content', '')
         content_key = content[:100].lower().strip()
+        if not content_key:
+            continue
 
-        if content_key and content_key not in seen_contents:
-            seen_contents.add(content_key)
+        key_hash = hash(content_key)
+        if key_hash not in seen_hashes:
+            seen_hashes.add(key_hash)
             unique_news.append(news)
 
     return unique_news
@@ -95,20 +179,9 @@ def filter_quality_news(news_list: List[Dict[str, Any]], min_length: int = 30) -
     Returns:
         Filtered news list
     """
-    quality_news = []
-
-    for news in news_list:
-        title = news.get('title', '')
-        content = news.get('content', '')
-
-        # Skip if title or content is empty
-        if not title or not content:
-            continue
-
-        # Skip if content is too short
-        if len(content) < min_length:
-            continue
-
-        quality_news.append(news)
-
-    return quality_news
+    # Skip if title or content is empty, or content is too short
+    # （单个推导式完成过滤，条件短路，无需 NumPy 掩码）
+    return [
+        news for news in news_list
+        if news.get('title') and news.get('content') and len(news['content']) >= min_length
+    ]
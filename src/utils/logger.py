@@ -2,7 +2,10 @@
 Logging configuration
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -49,9 +52,16 @@ def setup_logger(name: str = 'blockchain_daily', log_dir: str = 'logs') -> loggi
     )
     file_handler.setFormatter(file_format)
 
-    # Add handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # 调用线程只把日志记录放入队列，由后台线程写控制台和文件，避免磁盘写入阻塞主流程
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    # 退出时停止监听线程，确保队列中剩余的日志写完
+    atexit.register(listener.stop)
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logger
 
@@ -2,11 +2,17 @@
 Video Composer - MoviePy-based video assembly
 """
 
+import functools
 import os
+import random
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
-from src.config import VIDEO_RESOLUTION, VIDEO_FPS, VIDEO_OUTPUT_DIR
+from src.config import VIDEO_RESOLUTION, VIDEO_FPS, VIDEO_OUTPUT_DIR, VIDEO_ENCODER
 from src.utils.logger import get_logger
 
 # MoviePy 2.x 兼容导入
@@ -38,6 +44,90 @@ except ImportError:
     except ImportError:
         pass
 
+try:
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+except ImportError:
+    ffmpeg_parse_infos = None
+
+try:
+    from mutagen.mp3 import MP3
+except ImportError:
+    MP3 = None
+
+
+@functools.lru_cache(maxsize=1024)
+def _probe_duration_cached(path: str, mtime: float) -> float:
+    return ffmpeg_parse_infos(path)['duration']
+
+
+def _probe_duration(path: str) -> float:
+    """
+    Read media duration from container metadata without opening a decoder
+
+    Results are cached per file path and modification time.
+
+    Args:
+        path: Video or audio file path
+
+    Returns:
+        Duration in seconds
+    """
+    return _probe_duration_cached(path, os.path.getmtime(path))
+
+
+def _get_ffmpeg_binary() -> Optional[str]:
+    """Locate the ffmpeg binary bundled with MoviePy (imageio-ffmpeg) or on PATH"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return shutil.which('ffmpeg')
+
+
+# 硬件 H.264 编码器（按优先级）及其 ffmpeg 参数
+_HW_ENCODER_PARAMS = {
+    'h264_nvenc': ['-preset', 'p4', '-tune', 'hq'],
+    'h264_videotoolbox': ['-allow_sw', '1'],
+    'h264_qsv': ['-preset', 'medium'],
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_h264_encoder(ffmpeg: str) -> str:
+    """
+    Pick the first hardware H.264 encoder that actually works
+
+    Args:
+        ffmpeg: Path to the ffmpeg binary
+
+    Returns:
+        Encoder name, 'libx264' if no hardware encoder is usable
+    """
+    try:
+        listed = subprocess.run(
+            [ffmpeg, '-hide_banner', '-encoders'],
+            capture_output=True, text=True, timeout=10
+        ).stdout
+    except Exception:
+        return 'libx264'
+
+    for encoder, params in _HW_ENCODER_PARAMS.items():
+        if encoder not in listed:
+            continue
+        # 编码器编译进 ffmpeg 不代表有对应硬件，试编码一小段确认
+        try:
+            probe = subprocess.run(
+                [ffmpeg, '-hide_banner', '-loglevel', 'error',
+                 '-f', 'lavfi', '-i', 'color=size=256x256:duration=0.2',
+                 '-c:v', encoder, *params, '-f', 'null', '-'],
+                capture_output=True, timeout=30
+            )
+        except Exception:
+            continue
+        if probe.returncode == 0:
+            return encoder
+    return 'libx264'
+
 
 class VideoComposer:
     """Compose final video from clips, audio, and overlays"""
@@ -46,8 +136,29 @@ class VideoComposer:
         self.logger = get_logger('video_composer')
         self.resolution = VIDEO_RESOLUTION
         self.fps = VIDEO_FPS
+        # 目标分辨率固定，宽高比与 ffmpeg 缩放裁剪滤镜只计算一次
+        self._target_ratio = self.resolution[0] / self.resolution[1]
+        w, h = self.resolution
+        # 统一尺寸、像素格式与帧率，concat 要求各路一致
+        self._normalize_chain = (
+            f"scale={w}:{h}:force_original_aspect_ratio=increase,crop={w}:{h},"
+            f"setsar=1,fps={self.fps},format=yuv420p"
+        )
         self.output_dir = Path(VIDEO_OUTPUT_DIR)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # 占位背景渐变帧（首次使用时生成）
+        self._gradient = None
+
+        # 视频编码器：优先使用硬件编码器，软件编码时使用全部 CPU 核心
+        ffmpeg = _get_ffmpeg_binary()
+        if VIDEO_ENCODER != 'auto':
+            self.codec = VIDEO_ENCODER
+        elif ffmpeg:
+            self.codec = _detect_h264_encoder(ffmpeg)
+        else:
+            self.codec = 'libx264'
+        self.codec_params = _HW_ENCODER_PARAMS.get(self.codec, [])
+        self.threads = (os.cpu_count() or 4) if self.codec == 'libx264' else 4
 
         # 检查MoviePy是否可用
         if VideoFileClip is None:
@@ -58,7 +169,9 @@ class VideoComposer:
                 f"Run: {sys.executable} -m pip install moviepy"
             )
 
-        self.logger.info(f"VideoComposer initialized (MoviePy {'2.x' if MOVIEPY_V2 else '1.x'})")
+        self.logger.info(
+            f"VideoComposer initialized (MoviePy {'2.x' if MOVIEPY_V2 else '1.x'}, encoder: {self.codec})"
+        )
 
     def compose_video(
         self,
@@ -82,9 +195,16 @@ class VideoComposer:
             Path to output video
         """
 
+        work_dir = None
         try:
             self.logger.info(f"Composing video from {len(segments)} segments...")
 
+            # 常见情况（剪辑、变速、缩放裁剪、淡入淡出）直接由 ffmpeg 滤镜图一次完成，
+            # 不经 Python 逐帧解码再编码；不适用或失败时回退到 MoviePy
+            if self._compose_with_ffmpeg(segments, audio_path, output_path, cover_image):
+                self.logger.info(f"Video composed successfully: {output_path}")
+                return output_path
+
             # 加载音频获取总时长
             audio = AudioFileClip(audio_path)
             total_duration = audio.duration
@@ -93,22 +213,25 @@ class VideoComposer:
             # 构建视频片段
             from tqdm import tqdm
 
-            clips = []
-            pbar = tqdm(segments, desc="处理视频片段", unit="clip", ncols=80)
-
-            for i, segment in enumerate(pbar):
+            for i, segment in enumerate(segments):
                 video_path = segment.get('video_path')
-                target_duration = segment.get('duration', 8)
-
                 if not video_path or not os.path.exists(video_path):
                     # 不应该发生 - Pexels客户端保证返回视频
                     raise ValueError(f"视频片段 {i} 没有有效的视频文件: {video_path}")
 
-                pbar.set_postfix_str(f"clip_{i:03d}")
-                clip = self._process_clip(video_path, target_duration)
-
-                if clip:
-                    clips.append(clip)
+            # 各片段互相独立，并行处理（ffmpeg 子进程中执行，不受 GIL 限制），map 保持顺序
+            work_dir = tempfile.mkdtemp(prefix='compose_')
+            clips = []
+            pbar = tqdm(total=len(segments), desc="处理视频片段", unit="clip", ncols=80)
+            with ThreadPoolExecutor(max_workers=max(1, min(8, len(segments)))) as executor:
+                results = executor.map(
+                    lambda segment: self._process_clip(segment['video_path'], segment.get('duration', 8), work_dir),
+                    segments
+                )
+                for clip in results:
+                    pbar.update(1)
+                    if clip:
+                        clips.append(clip)
 
             pbar.close()
 
@@ -152,10 +275,12 @@ class VideoComposer:
             final_video.write_videofile(
                 output_path,
                 fps=self.fps,
-                codec='libx264',
+                codec=self.codec,
                 audio_codec='aac',
-                threads=4,
-                preset='medium',
+                threads=self.threads,
+                # preset 只对 libx264 有意义；硬件编码器的参数全部来自 codec_params
+                **({'preset': 'medium'} if self.codec == 'libx264' else {}),
+                ffmpeg_params=self.codec_params or None,
                 logger=None  # 禁用moviepy的进度条
             )
 
@@ -172,9 +297,188 @@ class VideoComposer:
             self.logger.error(f"Video composition failed: {e}")
             raise
 
-    def _process_clip(self, video_path: str, target_duration: float):
+        finally:
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _compose_with_ffmpeg(
+        self,
+        segments: List[Dict[str, Any]],
+        audio_path: str,
+        output_path: str,
+        cover_image: Optional[str] = None
+    ) -> bool:
+        """
+        Compose the video with a single ffmpeg filter graph
+
+        Mirrors the MoviePy path: random source offset, looping short clips,
+        0.95-1.05 speed jitter, scale + center crop, fades, optional cover intro.
+
+        Args:
+            segments: List of segments with 'video_path' and 'duration'
+            audio_path: Path to audio file
+            output_path: Output video path
+            cover_image: Optional cover image for intro
+
+        Returns:
+            True if the video was written, False if the MoviePy path should be used
+        """
+        ffmpeg = _get_ffmpeg_binary()
+        if not ffmpeg or ffmpeg_parse_infos is None:
+            return False
+
+        try:
+            total_duration = _probe_duration(audio_path)
+
+            input_args = []
+            filters = []
+            labels = []
+            video_duration = 0.0
+
+            # 封面：静态图片 3 秒
+            if cover_image and os.path.exists(cover_image):
+                input_args += ['-loop', '1', '-t', '3', '-i', cover_image]
+                filters.append(f"[0:v]{self._normalize_filter()},fade=t=in:st=0:d=0.5,fade=t=out:st=2.5:d=0.5[v0]")
+                labels.append('[v0]')
+                video_duration += 3
+
+            for segment in segments:
+                video_path = segment.get('video_path')
+                target_duration = segment.get('duration', 8)
+                if not video_path or not os.path.exists(video_path):
+                    return False
+
+                input_args += self._clip_input_args(video_path, target_duration)
+                speed_factor = random.uniform(0.95, 1.05)
+                clip_duration = target_duration / speed_factor
+                index = len(labels)
+                filters.append(f"[{index}:v]{self._build_filter(speed_factor, clip_duration)}[v{index}]")
+                labels.append(f'[v{index}]')
+                video_duration += clip_duration
+
+            if not labels:
+                return False
+
+            # 视频比音频短时 MoviePy 路径会循环整段视频，滤镜图中代价过高，交给 MoviePy
+            if video_duration < total_duration - 1:
+                return False
+            output_duration = total_duration if video_duration > total_duration + 1 else video_duration
+
+            filters.append(f"{''.join(labels)}concat=n={len(labels)}:v=1:a=0[vout]")
+            cmd = [
+                ffmpeg, '-y', '-hide_banner', '-loglevel', 'error',
+                *input_args,
+                '-i', audio_path,
+                '-filter_complex', ';'.join(filters),
+                '-map', '[vout]', '-map', f'{len(labels)}:a',
+                '-t', f'{output_duration:.3f}',
+                '-c:v', self.codec,
+                *(['-preset', 'medium'] if self.codec == 'libx264' else self.codec_params),
+                '-threads', str(self.threads),
+                '-c:a', 'aac',
+                output_path
+            ]
+
+            self.logger.info(f"Exporting video with ffmpeg filter graph to: {output_path}")
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                self.logger.warning(f"ffmpeg composition failed, falling back to MoviePy: {result.stderr[-500:]}")
+                return False
+            return True
+
+        except Exception as e:
+            self.logger.warning(f"ffmpeg composition failed, falling back to MoviePy: {e}")
+            return False
+
+    def _normalize_filter(self) -> str:
+        """Scale + center crop to the target resolution with uniform SAR, fps and pixel format"""
+        return self._normalize_chain
+
+    def _build_filter(self, speed_factor: float, clip_duration: float) -> str:
+        """
+        Build the fused per-clip filter chain (speed, resize, crop, fades)
+
+        Args:
+            speed_factor: Playback speed multiplier
+            clip_duration: Clip duration after the speed change
+
+        Returns:
+            ffmpeg filter chain
+        """
+        return (
+            f"setpts=(PTS-STARTPTS)/{speed_factor:.4f},{self._normalize_filter()},"
+            f"fade=t=in:st=0:d=0.4,fade=t=out:st={max(0.0, clip_duration - 0.4):.3f}:d=0.4"
+        )
+
+    def _clip_input_args(self, video_path: str, target_duration: float) -> List[str]:
+        """
+        ffmpeg input options cutting a random window of the source (or looping it)
+
+        Args:
+            video_path: Source video path
+            target_duration: Seconds of source footage to use
+
+        Returns:
+            Input options ending with ``-i video_path``
+        """
+        original_duration = _probe_duration(video_path)
+        # 随机选择起始点（不总是从头开始，更有变化）
+        if original_duration > target_duration + 2:
+            start_time = random.uniform(0, original_duration - target_duration - 1)
+        elif original_duration > target_duration:
+            start_time = random.uniform(0, original_duration - target_duration)
+        else:
+            # 素材不够，循环播放
+            return ['-stream_loop', '-1', '-t', f'{target_duration:.3f}', '-i', video_path]
+        # -ss 放在 -i 之前作为输入选项：按容器索引直接定位，不解码起点之前的帧
+        return ['-ss', f'{start_time:.3f}', '-t', f'{target_duration:.3f}', '-i', video_path]
+
+    def _prerender_clip(self, video_path: str, target_duration: float, work_dir: str) -> Optional[str]:
+        """
+        Cut, retime, resize and fade one clip in a single ffmpeg pass
+
+        Args:
+            video_path: Source video path
+            target_duration: Seconds of source footage to use
+            work_dir: Directory for the intermediate file
+
+        Returns:
+            Path to the intermediate clip, or None if ffmpeg is unavailable or failed
+        """
+        ffmpeg = _get_ffmpeg_binary()
+        if not ffmpeg or ffmpeg_parse_infos is None:
+            return None
+
+        try:
+            speed_factor = random.uniform(0.95, 1.05)
+            clip_duration = target_duration / speed_factor
+            fd, output = tempfile.mkstemp(suffix='.mp4', dir=work_dir)
+            os.close(fd)
+            # 中间文件只供随后合成读取，用最快预设、高画质
+            cmd = [
+                ffmpeg, '-y', '-hide_banner', '-loglevel', 'error',
+                *self._clip_input_args(video_path, target_duration),
+                '-vf', self._build_filter(speed_factor, clip_duration),
+                '-an', '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '18',
+                output
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                self.logger.warning(f"ffmpeg prerender failed for {video_path}: {result.stderr[-300:]}")
+                return None
+            return output
+        except Exception as e:
+            self.logger.warning(f"ffmpeg prerender failed for {video_path}: {e}")
+            return None
+
+    def _process_clip(self, video_path: str, target_duration: float, work_dir: Optional[str] = None):
         """Process a single video clip with creative editing"""
-        import random
+        # 优先用一次 ffmpeg 完成截取、变速、缩放裁剪和淡入淡出，MoviePy 只负责读取结果
+        if work_dir:
+            prerendered = self._prerender_clip(video_path, target_duration, work_dir)
+            if prerendered:
+                return VideoFileClip(prerendered)
 
         try:
             clip = VideoFileClip(video_path)
@@ -233,7 +537,7 @@ class VideoComposer:
     def _resize_clip(self, clip):
         """Resize and crop clip to target resolution"""
         target_w, target_h = self.resolution
-        target_ratio = target_w / target_h
+        target_ratio = self._target_ratio
 
         clip_ratio = clip.w / clip.h
 
@@ -282,18 +586,21 @@ class VideoComposer:
         import numpy as np
 
         # 创建一个深蓝色渐变背景，比纯黑好看
-        def make_gradient_frame(t):
-            """Generate a subtle animated gradient"""
+        # 渐变与时间无关，只计算一次，每帧直接复用同一数组
+        if self._gradient is None:
             w, h = self.resolution
-            # 创建垂直渐变：从深蓝到更深的蓝
-            gradient = np.zeros((h, w, 3), dtype=np.uint8)
-            for y in range(h):
-                # 深蓝色渐变 (15,25,45) 到 (5,10,25)
-                ratio = y / h
-                r = int(15 - 10 * ratio)
-                g = int(25 - 15 * ratio)
-                b = int(45 - 20 * ratio)
-                gradient[y, :] = [r, g, b]
+            # 创建垂直渐变：深蓝色 (15,25,45) 到 (5,10,25)，按行广播到整幅画面
+            # （比例取 y/h 而非 linspace 含端点，与原逐行计算的取值一致；只物化一次，
+            # 避免零拷贝广播视图在每帧 tobytes/合成时反复展开）
+            ratio = np.arange(h, dtype=np.float64)[:, None] / h
+            rows = (np.array([15, 25, 45]) - np.array([10, 15, 20]) * ratio).astype(np.uint8)
+            self._gradient = np.ascontiguousarray(np.broadcast_to(rows[:, None, :], (h, w, 3)))
+            # 所有占位片段的每一帧共享这一块内存，设为只读防止被下游意外修改
+            self._gradient.flags.writeable = False
+        gradient = self._gradient
+
+        def make_gradient_frame(t):
+            """Return the precomputed gradient frame"""
             return gradient
 
         try:
@@ -357,7 +664,10 @@ class VideoComposer:
             final = CompositeVideoClip([video, watermark])
 
             output = output_path or video_path.replace('.mp4', '_watermarked.mp4')
-            final.write_videofile(output, fps=self.fps, codec='libx264', audio_codec='aac')
+            final.write_videofile(
+                output, fps=self.fps, codec=self.codec, audio_codec='aac',
+                ffmpeg_params=self.codec_params or None
+            )
 
             video.close()
             final.close()
@@ -368,7 +678,22 @@ class VideoComposer:
             self.logger.error(f"Failed to add watermark: {e}")
             return video_path
 
+    def get_audio_duration(self, audio_path: str) -> float:
+        """Get audio duration in seconds"""
+        # MP3（Fish.audio 输出格式）只解析 Xing/VBR 帧头，无需启动 ffmpeg 子进程
+        if MP3 is not None and audio_path.lower().endswith('.mp3'):
+            try:
+                return MP3(audio_path).info.length
+            except Exception as e:
+                self.logger.debug(f"mutagen could not read {audio_path}: {e}")
+        if ffmpeg_parse_infos is not None:
+            return _probe_duration(audio_path)
+        with AudioFileClip(audio_path) as clip:
+            return clip.duration
+
     def get_video_duration(self, video_path: str) -> float:
         """Get video duration in seconds"""
+        if ffmpeg_parse_infos is not None:
+            return _probe_duration(video_path)
         with VideoFileClip(video_path) as clip:
             return clip.duration
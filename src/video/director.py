@@ -2,10 +2,12 @@
 Video Director - LLM-powered storyboard generator
 """
 
+import hashlib
 import json
 import re
+import time
+from pathlib import Path
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
 
 from src.config import (
     OPENROUTER_API_KEY,
@@ -13,8 +15,20 @@ from src.config import (
     OPENROUTER_MODEL,
     KEYWORD_MAPPING
 )
+from src.utils.clients import get_openai_client
+from src.utils.helpers import loads_json, dumps_json
 from src.utils.logger import get_logger
 
+STORYBOARD_CACHE_TTL = 7 * 86400  # 分镜缓存有效期（秒）
+
+# LLM 响应中的 JSON 代码块（```json 或 ```）
+_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+# 分镜前清理的 Markdown 标记
+_MD_HEADING_RE = re.compile(r'#{1,6}\s*')
+_MD_BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+_EMOJI_RE = re.compile(r'[📊🏛️💰🔧💼✨✓⚠️❌✅]')
+
 
 class VideoDirector:
     """
@@ -22,26 +36,22 @@ class VideoDirector:
     Converts Chinese text into Pexels-searchable English keywords.
     """
 
-    def __init__(self):
+    def __init__(self, cache_dir: str = "cache"):
         self.logger = get_logger('video_director')
 
+        # 相同脚本、时长和模型的分镜结果缓存在磁盘上，重跑时不再调用 LLM
+        self.storyboard_cache_dir = Path(cache_dir) / "storyboards"
+        self.storyboard_cache_dir.mkdir(parents=True, exist_ok=True)
+
         if not OPENROUTER_API_KEY:
             raise ValueError("OPENROUTER_API_KEY must be set")
 
-        # 创建不带代理的 httpx client
-        import httpx
-        http_client = httpx.Client(
-            base_url=OPENROUTER_BASE_URL,
-            timeout=60.0
-        )
-
-        self.client = OpenAI(
-            api_key=OPENROUTER_API_KEY,
-            base_url=OPENROUTER_BASE_URL,
-            http_client=http_client
-        )
+        # 与文章生成共用同一个客户端（HTTP/2 + 长连接），复用已建立的 TLS 连接
+        self.client = get_openai_client(OPENROUTER_BASE_URL, OPENROUTER_API_KEY, 120.0)
         self.model = OPENROUTER_MODEL
         self.keyword_mapping = KEYWORD_MAPPING
+        # 预先转小写，匹配时保持映射表顺序（先出现的词条优先）
+        self._keyword_terms_lower = [(cn.lower(), en) for cn, en in KEYWORD_MAPPING.items()]
 
         self.logger.info(f"Video Director initialized with model: {self.model}")
 
@@ -63,6 +73,12 @@ class VideoDirector:
         try:
             self.logger.info("Generating storyboard from script...")
 
+            cache_key = self._storyboard_cache_key(script, target_duration)
+            cached = self._load_cached_storyboard(cache_key)
+            if cached:
+                self.logger.info(f"Storyboard cache hit: {len(cached)} segments")
+                return self._optimize_keywords(cached)
+
             prompt = self._create_director_prompt(script, target_duration)
 
             response = self.client.chat.completions.create(
@@ -85,10 +101,11 @@ class VideoDirector:
                     }
                 ],
                 temperature=0.7,
-                max_tokens=4000
+                max_tokens=4000,
+                stream=True
             )
 
-            result = response.choices[0].message.content
+            result = self._read_storyboard_stream(response)
             self.logger.info(f"LLM response length: {len(result)} chars")
             self.logger.debug(f"LLM response preview: {result[:300]}...")
 
@@ -99,6 +116,8 @@ class VideoDirector:
                 self.logger.warning("LLM storyboard parsing failed, using simple segmentation")
                 self.logger.info(f"Raw LLM response: {result[:500]}")
                 segments = self._simple_segmentation(script)
+            else:
+                self._save_cached_storyboard(cache_key, segments)
 
             # 应用关键词映射优化
             segments = self._optimize_keywords(segments)
@@ -111,6 +130,102 @@ class VideoDirector:
             # 返回简单的分段作为兜底
             return self._simple_segmentation(script)
 
+    def _read_storyboard_stream(self, stream) -> str:
+        """
+        Collect a streamed LLM response, stopping once a complete JSON array arrives
+
+        Anything the model writes after the storyboard array is never waited for.
+
+        Args:
+            stream: Streaming chat completion
+
+        Returns:
+            The first valid JSON array in the response, or the whole
+            response text if none is found
+        """
+        buf = ''
+        scanned = 0
+        start = -1  # 当前候选数组的起始位置
+        depth = 0
+        in_string = False
+        escape = False
+
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                buf += delta
+
+                # 增量扫描新到达的字符，跟踪数组括号深度（跳过字符串内的括号）
+                i = scanned
+                while i < len(buf):
+                    ch = buf[i]
+                    i += 1
+                    if start < 0:
+                        if ch == '[':
+                            start, depth = i - 1, 1
+                        continue
+                    if in_string:
+                        if escape:
+                            escape = False
+                        elif ch == '\\':
+                            escape = True
+                        elif ch == '"':
+                            in_string = False
+                    elif ch == '"':
+                        in_string = True
+                    elif ch == '[':
+                        depth += 1
+                    elif ch == ']':
+                        depth -= 1
+                        if depth == 0:
+                            try:
+                                if isinstance(loads_json(buf[start:i]), list):
+                                    return buf[start:i]
+                            except ValueError:
+                                pass
+                            # 不是合法 JSON 数组（如正文中的方括号），从候选起点之后重新扫描，
+                            # 并重置字符串状态，避免候选内的引号影响后续解析
+                            i, start = start + 1, -1
+                            in_string = escape = False
+                scanned = len(buf)
+
+            return buf
+
+        finally:
+            # 提前结束时关闭连接，不再接收剩余输出
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+
+    def _storyboard_cache_key(self, script: str, target_duration: Optional[int]) -> str:
+        """Cache key for a storyboard: SHA256 of model, target duration and script"""
+        raw = f"{self.model}|{target_duration}|{script}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _load_cached_storyboard(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Load a cached storyboard newer than STORYBOARD_CACHE_TTL, or None on miss"""
+        cache_path = self.storyboard_cache_dir / f"{key}.json"
+        try:
+            if time.time() - cache_path.stat().st_mtime > STORYBOARD_CACHE_TTL:
+                return None
+            return loads_json(cache_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable storyboard cache entry {cache_path.name}: {e}")
+            return None
+
+    def _save_cached_storyboard(self, key: str, segments: List[Dict[str, Any]]):
+        """Persist a parsed storyboard to the cache"""
+        try:
+            (self.storyboard_cache_dir / f"{key}.json").write_bytes(dumps_json(segments))
+        except (OSError, TypeError) as e:
+            self.logger.warning(f"Failed to write storyboard cache: {e}")
+
     def _create_director_prompt(self, script: str, target_duration: Optional[int]) -> str:
         """Create prompt for director LLM"""
         # 只取脚本前1500字，避免太长
@@ -144,20 +259,24 @@ class VideoDirector:
 
             # 提取JSON
             json_str = None
-
-            # 方法1: 从 ```json ``` 代码块提取
-            json_match = re.search(r'```json\s*(.*?)\s*```', llm_response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-
-            # 方法2: 从 ``` ``` 代码块提取
-            if not json_str:
-                json_match = re.search(r'```\s*(.*?)\s*```', llm_response, re.DOTALL)
+            segments = None
+
+            # 方法1: 整个响应就是 JSON 数组（流式读取通常只返回数组本身）
+            stripped = llm_response.strip()
+            if stripped.startswith('['):
+                try:
+                    segments = loads_json(stripped)
+                except ValueError:
+                    pass
+
+            # 方法2: 从 ```json ``` 或 ``` ``` 代码块提取
+            if segments is None:
+                json_match = _FENCE_RE.search(llm_response)
                 if json_match:
                     json_str = json_match.group(1)
 
             # 方法3: 直接找 [ ] 数组
-            if not json_str:
+            if segments is None and not json_str:
                 json_str = llm_response.strip()
                 start = json_str.find('[')
                 end = json_str.rfind(']') + 1
@@ -167,7 +286,8 @@ class VideoDirector:
                     self.logger.warning("No JSON array found in response")
                     return []
 
-            segments = json.loads(json_str)
+            if segments is None:
+                segments = loads_json(json_str)
 
             # 验证格式
             validated = []
@@ -195,11 +315,11 @@ class VideoDirector:
             text = seg.get('text', '')
             keyword = seg.get('keyword', '')
 
-            # 检查是否有更好的映射
-            for cn_term, en_keyword in self.keyword_mapping.items():
-                if cn_term.lower() in text.lower():
-                    # 如果原关键词比较弱，使用映射
-                    if len(keyword) < 15 or keyword == 'technology abstract background':
+            # 如果原关键词比较弱，检查是否有更好的映射（关键词足够具体时无需扫描映射表）
+            if len(keyword) < 15 or keyword == 'technology abstract background':
+                text_lower = text.lower()
+                for cn_term, en_keyword in self._keyword_terms_lower:
+                    if cn_term in text_lower:
                         keyword = en_keyword
                         break
 
@@ -225,9 +345,9 @@ class VideoDirector:
         ]
 
         # 清理 Markdown 格式
-        clean_script = re.sub(r'#{1,6}\s*', '', script)  # 移除标题
-        clean_script = re.sub(r'\*\*([^*]+)\*\*', r'\1', clean_script)  # 移除粗体
-        clean_script = re.sub(r'[📊🏛️💰🔧💼✨✓⚠️❌✅]', '', clean_script)  # 移除emoji
+        clean_script = _MD_HEADING_RE.sub('', script)  # 移除标题
+        clean_script = _MD_BOLD_RE.sub(r'\1', clean_script)  # 移除粗体
+        clean_script = _EMOJI_RE.sub('', clean_script)  # 移除emoji
 
         # 按段落分割
         paragraphs = clean_script.split('\n\n')
@@ -244,7 +364,7 @@ class VideoDirector:
             char_count = len(para)
             duration = max(5, min(15, int(char_count / 250 * 60)))
 
-            # 尝试从映射表获取关键词
+            # 尝试从映射表获取关键词（段落数×词条数均在几十以内，`in` 子串查找已在 C 层完成）
             keyword = None
             for cn_term, en_keyword in self.keyword_mapping.items():
                 if cn_term in para:
@@ -4,6 +4,8 @@ Video Generator - Main orchestrator for video generation pipeline
 
 import os
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -38,6 +40,11 @@ class VideoGenerator:
         self._director = None
         self._pexels = None
         self._composer = None
+        self._composer_lock = threading.Lock()
+
+        # 合成器初始化要探测硬件编码器（启动 ffmpeg 试编码），在后台预热，与 TTS / LLM 调用重叠
+        if ENABLE_VIDEO_GENERATION:
+            threading.Thread(target=self._warm_up_composer, daemon=True).start()
 
         self.logger.info("VideoGenerator initialized")
 
@@ -61,10 +68,20 @@ class VideoGenerator:
 
     @property
     def composer(self) -> VideoComposer:
-        if self._composer is None:
-            self._composer = VideoComposer()
+        # 预热线程与 TTS 线程可能同时访问，只初始化一次
+        with self._composer_lock:
+            if self._composer is None:
+                self._composer = VideoComposer()
         return self._composer
 
+    def _warm_up_composer(self):
+        """Initialize the composer ahead of first use"""
+        try:
+            self.composer
+        except Exception as e:
+            # 失败时不缓存，首次实际使用时重新初始化并抛出错误
+            self.logger.debug(f"Composer warm-up failed: {e}")
+
     def generate_video(
         self,
         script: str,
@@ -100,43 +117,47 @@ class VideoGenerator:
             clips_dir = work_dir / "clips"
             clips_dir.mkdir(exist_ok=True)
 
-            # Step 1: 生成音频
-            self.logger.info("\n[Video Step 1/4] Generating audio with TTS...")
-            self.logger.info("  → 正在调用 Fish.audio API...")
+            # Step 1 与 Step 2 互相独立：TTS 在后台线程生成，分镜按预估时长同时生成，
+            # 素材下载也不必等待音频，最后再按实际音频时长校准分镜
             audio_path = str(work_dir / "narration.mp3")
-            self.tts.generate_audio(script, audio_path)
-            self.logger.info("  ✓ 音频生成完成")
-
-            # 获取音频时长
-            try:
-                from moviepy import AudioFileClip
-            except ImportError:
-                from moviepy.editor import AudioFileClip
-            with AudioFileClip(audio_path) as audio:
-                audio_duration = audio.duration
-            self.logger.info(f"Audio duration: {audio_duration:.1f}s")
-
-            # Step 2: 生成分镜
-            self.logger.info("\n[Video Step 2/4] Generating storyboard...")
-            self.logger.info("  → 正在调用 LLM 分析脚本生成分镜...")
-            segments = self.director.generate_storyboard(
-                script,
-                target_duration=int(audio_duration)
-            )
-            self.logger.info(f"  ✓ 生成 {len(segments)} 个分镜片段")
-
-            # 调整分镜时长匹配音频
+            estimated_duration = self.director.estimate_audio_duration(script)
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # Step 1: 生成音频
+                self.logger.info("\n[Video Step 1/4] Generating audio with TTS...")
+                self.logger.info("  → 正在调用 Fish.audio API...")
+                audio_future = executor.submit(self._generate_narration, script, audio_path)
+
+                # Step 2: 生成分镜
+                self.logger.info("\n[Video Step 2/4] Generating storyboard...")
+                self.logger.info("  → 正在调用 LLM 分析脚本生成分镜...")
+                storyboard_future = executor.submit(
+                    self.director.generate_storyboard,
+                    script,
+                    target_duration=int(estimated_duration)
+                )
+                segments = storyboard_future.result()
+                self.logger.info(f"  ✓ 生成 {len(segments)} 个分镜片段")
+
+                # 先按预估时长分配片段时长，用于素材搜索
+                segments = self.director.sync_with_audio(segments, estimated_duration)
+
+                # Step 3: 下载视频素材（与 TTS 并行）
+                self.logger.info("\n[Video Step 3/4] Downloading video clips from Pexels...")
+                self.logger.info(f"  → 需要下载 {len(segments)} 个视频片段...")
+                segments = self.pexels.download_videos_for_segments(
+                    segments,
+                    str(clips_dir)
+                )
+                self.logger.info("  ✓ 视频素材下载完成")
+
+                audio_duration = audio_future.result()
+                self.logger.info("  ✓ 音频生成完成")
+                self.logger.info(f"Audio duration: {audio_duration:.1f}s")
+
+            # 调整分镜时长匹配实际音频
             segments = self.director.sync_with_audio(segments, audio_duration)
 
-            # Step 3: 下载视频素材
-            self.logger.info("\n[Video Step 3/4] Downloading video clips from Pexels...")
-            self.logger.info(f"  → 需要下载 {len(segments)} 个视频片段...")
-            segments = self.pexels.download_videos_for_segments(
-                segments,
-                str(clips_dir)
-            )
-            self.logger.info("  ✓ 视频素材下载完成")
-
             # Step 4: 合成视频
             self.logger.info("\n[Video Step 4/4] Composing final video...")
             self.logger.info("  → 正在合成视频（这一步可能需要1-3分钟）...")
@@ -181,6 +202,22 @@ class VideoGenerator:
                 'error': str(e)
             }
 
+    def _generate_narration(self, script: str, audio_path: str) -> float:
+        """
+        Generate the narration audio and measure it
+
+        Args:
+            script: Video script text
+            audio_path: Output audio path
+
+        Returns:
+            Audio duration in seconds
+        """
+        self.tts.generate_audio(script, audio_path)
+
+        # 获取音频时长（只读容器元数据，不创建 MoviePy 读取器）
+        return self.composer.get_audio_duration(audio_path)
+
     def generate_video_simple(
         self,
         article_data: Dict[str, Any],
@@ -5,18 +5,23 @@ Pexels API Client for video stock footage
 import os
 import random
 import hashlib
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-import urllib.request
 
 from src.config import (
     PEXELS_API_KEY,
     VIDEO_ORIENTATION,
     FALLBACK_ASSETS_DIR
 )
+from src.utils.clients import get_http_session
+from src.utils.helpers import link_or_copy
 from src.utils.logger import get_logger
 
+DOWNLOAD_CHUNK_BYTES = 1 << 20  # 视频下载分块大小（1 MB）
+
 
 class PexelsClient:
     """Client for Pexels video API"""
@@ -49,8 +54,77 @@ class PexelsClient:
 
         self.fallback_dir = Path(FALLBACK_ASSETS_DIR)
 
+        # 搜索与下载请求复用共享连接池
+        self.session = get_http_session()
+
+        # 并发下载时同一缓存文件只由一个线程写入，其余线程等待后直接命中缓存
+        self._cache_locks: Dict[str, threading.Lock] = {}
+        self._cache_locks_guard = threading.Lock()
+
+        # 缓存文件的内存索引，命中判断与随机挑选不再逐次 stat / glob 缓存目录
+        self._cache_index = set(self.cache_dir.glob("*.mp4"))
+        self._cache_index_lock = threading.Lock()
+
+        # 实例私有的随机数生成器，不与其他模块共享全局随机状态
+        self._rng = random.Random()
+
         self.logger.info("Pexels client initialized")
 
+    def _cache_lock(self, cache_key: str) -> threading.Lock:
+        """Get the lock guarding one cache entry"""
+        with self._cache_locks_guard:
+            return self._cache_locks.setdefault(cache_key, threading.Lock())
+
+    @staticmethod
+    def _cache_key(query: str) -> str:
+        """Derive the cache file stem for a search query"""
+        return hashlib.blake2b(query.encode(), digest_size=8).hexdigest()
+
+    def _cached_videos(self) -> List[Path]:
+        """Snapshot of the cached video files"""
+        with self._cache_index_lock:
+            return list(self._cache_index)
+
+    def _download_to_cache(self, download_url: str, cache_path: Path):
+        """
+        Download a video into the cache atomically
+
+        The file is written under a temporary name and renamed when complete,
+        so concurrent readers never pick up a partial download.
+
+        Args:
+            download_url: Video file URL
+            cache_path: Final cache file path
+        """
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            'Referer': 'https://www.pexels.com/'
+        }
+        tmp_path = cache_path.with_name(f"{cache_path.stem}.{threading.get_ident()}.part")
+
+        try:
+            # 流式分块写入，不把整个视频读进内存；复用连接池中的长连接
+            with self.session.get(download_url, headers=headers, stream=True, timeout=(5, 60)) as response:
+                response.raise_for_status()
+                total = int(response.headers.get('Content-Length') or 0)
+                with open(str(tmp_path), 'wb') as f:
+                    # 已知大小时一次性预分配磁盘空间，减少碎片与写入时的元数据更新
+                    if total > 0 and hasattr(os, 'posix_fallocate'):
+                        try:
+                            os.posix_fallocate(f.fileno(), 0, total)
+                        except OSError:
+                            pass
+                    # writelines 在 C 层循环写出各个 1 MB 分块，内存占用与视频大小无关
+                    f.writelines(response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES))
+                    # 预分配会把文件扩展到 Content-Length，实际内容较短时（如经过压缩传输）截掉多余部分
+                    f.truncate()
+            os.replace(tmp_path, cache_path)
+            with self._cache_index_lock:
+                self._cache_index.add(cache_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
     def search_video(
         self,
         query: str,
@@ -79,7 +153,7 @@ class PexelsClient:
                 "size": "medium"  # medium is usually HD (1080p)
             }
 
-            response = requests.get(
+            response = self.session.get(
                 self.BASE_URL,
                 headers=headers,
                 params=params,
@@ -100,7 +174,7 @@ class PexelsClient:
                 suitable = videos  # 如果都不符合时长，用全部
 
             # 随机选一个避免重复
-            video = random.choice(suitable)
+            video = self._rng.choice(suitable)
 
             return video
 
@@ -157,41 +231,33 @@ class PexelsClient:
         Returns:
             Path to downloaded video (always returns a valid path)
         """
-        import shutil
-
-        # 检查缓存
-        cache_key = hashlib.md5(query.encode()).hexdigest()[:16]
+        # 检查缓存（按关键词命中，不做 ETag 再验证：命中时没有下载地址，验证需要先调用一次搜索 API，
+        # 代价高于直接复用；下载经 .part 临时文件原子改名，缓存中不会出现残缺文件）
+        cache_key = self._cache_key(query)
         cache_path = self.cache_dir / f"{cache_key}.mp4"
 
-        if cache_path.exists():
-            self.logger.info(f"Using cached video for: {query}")
-            shutil.copy(cache_path, output_path)
-            return output_path
+        with self._cache_lock(cache_key):
+            if cache_path in self._cache_index:
+                self.logger.debug(f"Using cached video for: {query}")
+                link_or_copy(cache_path, output_path)
+                return output_path
 
-        # 搜索视频
-        video_data = self.search_video(query, min_duration=min_duration)
+            # 搜索视频
+            video_data = self.search_video(query, min_duration=min_duration)
 
-        if video_data:
-            download_url = self.get_download_url(video_data)
-            if download_url:
-                try:
-                    self.logger.info(f"Downloading video for: {query}")
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                        'Referer': 'https://www.pexels.com/'
-                    }
-                    req = urllib.request.Request(download_url, headers=headers)
-
-                    with urllib.request.urlopen(req, timeout=60) as response:
-                        with open(str(cache_path), 'wb') as f:
-                            f.write(response.read())
-
-                    shutil.copy(cache_path, output_path)
-                    self.logger.info(f"Video downloaded: {output_path}")
-                    return output_path
-
-                except Exception as e:
-                    self.logger.warning(f"Download failed for '{query}': {e}")
+            if video_data:
+                download_url = self.get_download_url(video_data)
+                if download_url:
+                    try:
+                        self.logger.debug(f"Downloading video for: {query}")
+                        self._download_to_cache(download_url, cache_path)
+
+                        link_or_copy(cache_path, output_path)
+                        self.logger.debug(f"Video downloaded: {output_path}")
+                        return output_path
+
+                    except Exception as e:
+                        self.logger.warning(f"Download failed for '{query}': {e}")
 
         # 原始查询失败，使用备用方案（必须成功）
         return self._get_fallback_video_guaranteed(output_path)
@@ -201,31 +267,30 @@ class PexelsClient:
         Get a fallback video - GUARANTEED to return a valid video path
         Will try multiple strategies until one succeeds
         """
-        import shutil
-
         # 策略1: 使用本地备用视频
         if self.fallback_dir.exists():
             fallback_videos = list(self.fallback_dir.glob("*.mp4"))
             if fallback_videos:
-                fallback = random.choice(fallback_videos)
-                shutil.copy(fallback, output_path)
+                fallback = self._rng.choice(fallback_videos)
+                link_or_copy(fallback, output_path)
                 self.logger.info(f"Using local fallback: {fallback.name}")
                 return output_path
 
         # 策略2: 使用已缓存的任意视频
-        cached_videos = list(self.cache_dir.glob("*.mp4"))
+        cached_videos = self._cached_videos()
         if cached_videos:
-            cached = random.choice(cached_videos)
-            shutil.copy(cached, output_path)
+            cached = self._rng.choice(cached_videos)
+            link_or_copy(cached, output_path)
             self.logger.info(f"Using cached video: {cached.name}")
             return output_path
 
         # 策略3: 尝试所有备用关键词直到成功
         self.logger.info("Trying ALL fallback queries from Pexels...")
-        random.shuffle(self.FALLBACK_QUERIES)
+        # 打乱副本，不修改类属性（其他线程正按下标读取）
+        fallback_queries = self._rng.sample(self.FALLBACK_QUERIES, len(self.FALLBACK_QUERIES))
 
-        for fallback_query in self.FALLBACK_QUERIES:
-            self.logger.info(f"Trying: {fallback_query}")
+        for fallback_query in fallback_queries:
+            self.logger.debug(f"Trying: {fallback_query}")
 
             video_data = self.search_video(fallback_query, min_duration=3)
             if not video_data:
@@ -236,20 +301,14 @@ class PexelsClient:
                 continue
 
             try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                    'Referer': 'https://www.pexels.com/'
-                }
-                req = urllib.request.Request(download_url, headers=headers)
-
-                cache_key = hashlib.md5(fallback_query.encode()).hexdigest()[:16]
+                cache_key = self._cache_key(fallback_query)
                 cache_path = self.cache_dir / f"{cache_key}.mp4"
 
-                with urllib.request.urlopen(req, timeout=60) as response:
-                    with open(str(cache_path), 'wb') as f:
-                        f.write(response.read())
+                with self._cache_lock(cache_key):
+                    if cache_path not in self._cache_index:
+                        self._download_to_cache(download_url, cache_path)
 
-                shutil.copy(cache_path, output_path)
+                link_or_copy(cache_path, output_path)
                 self.logger.info(f"Downloaded fallback: {fallback_query}")
                 return output_path
 
@@ -258,10 +317,10 @@ class PexelsClient:
                 continue
 
         # 策略4: 最后的备用 - 再次检查缓存（可能上面的尝试已经缓存了一些）
-        cached_videos = list(self.cache_dir.glob("*.mp4"))
+        cached_videos = self._cached_videos()
         if cached_videos:
-            cached = random.choice(cached_videos)
-            shutil.copy(cached, output_path)
+            cached = self._rng.choice(cached_videos)
+            link_or_copy(cached, output_path)
             self.logger.info(f"Using newly cached video: {cached.name}")
             return output_path
 
@@ -292,31 +351,58 @@ class PexelsClient:
 
         Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-        results = []
-        pbar = tqdm(segments, desc="下载视频素材", unit="clip", ncols=80)
+        if not segments:
+            return []
 
-        for i, segment in enumerate(pbar):
+        # 相同关键词只下载一次（按首次出现的片段），其余片段直接链接到同一文件
+        groups: Dict[str, List[int]] = {}
+        for i, segment in enumerate(segments):
             # 使用备用关键词池确保有好的搜索词
             keyword = segment.get('keyword') or self.FALLBACK_QUERIES[i % len(self.FALLBACK_QUERIES)]
-            duration = segment.get('duration', 8)
-
-            pbar.set_postfix_str(keyword[:25])
+            groups.setdefault(keyword, []).append(i)
+
+        # 进度条最多每 250ms 刷新一次，并发完成时不逐个写终端
+        pbar = tqdm(total=len(segments), desc="下载视频素材", unit="clip", ncols=80, mininterval=0.25)
+        downloaded = {}
+
+        # 搜索与下载都是网络 I/O，多个关键词并发进行；结果按下标回填，保持原顺序
+        # （每个线程先搜索再下载，各关键词的搜索请求在同一批次内重叠）
+        with ThreadPoolExecutor(max_workers=min(8, len(groups))) as executor:
+            futures = {}
+            for keyword, indices in groups.items():
+                # 素材需覆盖组内最长的片段
+                duration = max(segments[i].get('duration', 8) for i in indices)
+                video_path = os.path.join(output_dir, f"clip_{indices[0]:03d}.mp4")
+
+                # download_video 保证返回有效路径
+                future = executor.submit(
+                    self.download_video,
+                    query=keyword,
+                    output_path=video_path,
+                    min_duration=int(duration)
+                )
+                futures[future] = keyword
+
+            for future in as_completed(futures):
+                keyword = futures[future]
+                indices = groups[keyword]
+                video_path = future.result()
+                downloaded[indices[0]] = video_path
+                for i in indices[1:]:
+                    duplicate_path = os.path.join(output_dir, f"clip_{i:03d}.mp4")
+                    link_or_copy(video_path, duplicate_path)
+                    downloaded[i] = duplicate_path
+                pbar.set_postfix_str(keyword[:25], refresh=False)
+                pbar.update(len(indices))
 
-            video_path = os.path.join(output_dir, f"clip_{i:03d}.mp4")
-
-            # download_video 保证返回有效路径
-            downloaded = self.download_video(
-                query=keyword,
-                output_path=video_path,
-                min_duration=int(duration)
-            )
+        pbar.close()
 
+        results = []
+        for i, segment in enumerate(segments):
             segment_result = segment.copy()
-            segment_result['video_path'] = downloaded
+            segment_result['video_path'] = downloaded[i]
             results.append(segment_result)
 
-        pbar.close()
-
         self.logger.info(f"All {len(segments)} videos downloaded successfully")
 
         return results
@@ -327,4 +413,6 @@ class PexelsClient:
         if self.cache_dir.exists():
             shutil.rmtree(self.cache_dir)
             self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with self._cache_index_lock:
+                self._cache_index.clear()
             self.logger.info("Cache cleared")
@@ -4,12 +4,28 @@ TTS Generator using Fish.audio API
 
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
 from src.config import FISH_AUDIO_API_KEY, FISH_AUDIO_VOICE_ID
 from src.utils.logger import get_logger
 
+TTS_WRITE_BUFFER_BYTES = 1 << 20  # 音频文件写缓冲（1 MB）
+
+# TTS 文本清理用的正则（模块加载时编译一次）
+_MD_HEADING_RE = re.compile(r'#{1,6}\s*')
+_MD_BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+_MD_ITALIC_RE = re.compile(r'\*([^*]+)\*')
+_MD_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_MD_CODE_BLOCK_RE = re.compile(r'```[^`]+```')
+_MD_INLINE_CODE_RE = re.compile(r'`([^`]+)`')
+_MD_LIST_RE = re.compile(r'^[-*]\s+', re.MULTILINE)
+_MD_QUOTE_RE = re.compile(r'^>\s+', re.MULTILINE)
+_MD_RULE_RE = re.compile(r'---+')
+_EMOJI_RE = re.compile(r'[📊🏛️💰🔧💼✨✓⚠️❌✅]')
+_EXTRA_NEWLINES_RE = re.compile(r'\n{3,}')
+
 
 class TTSGenerator:
     """Text-to-Speech generator using Fish.audio"""
@@ -22,6 +38,7 @@ class TTSGenerator:
 
         self._use_legacy_sdk = False
 
+        # SDK 客户端每个实例只创建一次，内部的 httpx 连接池在各次（含并发分段）合成间复用 TLS 连接
         try:
             from fishaudio import FishAudio
             self.client = FishAudio(api_key=FISH_AUDIO_API_KEY)
@@ -53,7 +70,7 @@ class TTSGenerator:
             text: Text to convert to speech
             output_path: Output file path
             voice_id: Optional voice ID (uses default if not specified)
-            use_preprocessor: Whether to use TTS preprocessor for emotion tags
+            use_preprocessor: Whether to use the TTS preprocessor
 
         Returns:
             Path to generated audio file
@@ -61,11 +78,10 @@ class TTSGenerator:
         try:
             self.logger.info(f"Generating audio for {len(text)} characters...")
 
-            # 使用预处理器添加情绪标签
+            # 使用预处理器清理文本（进程内共享同一实例）
             if use_preprocessor:
-                from .tts_preprocessor import TTSPreprocessor
-                preprocessor = TTSPreprocessor()
-                clean_text = preprocessor.process(text)
+                from .tts_preprocessor import get_preprocessor
+                clean_text = get_preprocessor().process(text)
             else:
                 # 简单清理
                 clean_text = self._clean_text(text)
@@ -104,15 +120,15 @@ class TTSGenerator:
         """Generate audio using legacy fish_audio_sdk"""
         import fish_audio_sdk
 
-        with open(output_path, 'wb') as f:
-            for chunk in self.client.tts(
+        # writelines 在 C 层逐块写入流式返回的音频，大缓冲区减少系统调用次数
+        with open(output_path, 'wb', buffering=TTS_WRITE_BUFFER_BYTES) as f:
+            f.writelines(self.client.tts(
                 fish_audio_sdk.TTSRequest(
                     text=text,
                     reference_id=voice_id if voice_id else None,
                     format="mp3",
                 )
-            ):
-                f.write(chunk)
+            ))
 
         self.logger.info(f"Audio saved to: {output_path}")
         return output_path
@@ -120,21 +136,32 @@ class TTSGenerator:
     def _clean_text(self, text: str) -> str:
         """Clean text for TTS"""
         # 移除Markdown格式
-        clean = re.sub(r'#{1,6}\s*', '', text)  # 移除标题标记
-        clean = re.sub(r'\*\*([^*]+)\*\*', r'\1', clean)  # 移除粗体
-        clean = re.sub(r'\*([^*]+)\*', r'\1', clean)  # 移除斜体
-        clean = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', clean)  # 移除链接
-        clean = re.sub(r'```[^`]+```', '', clean)  # 移除代码块
-        clean = re.sub(r'`([^`]+)`', r'\1', clean)  # 移除行内代码
-        clean = re.sub(r'^[-*]\s+', '', clean, flags=re.MULTILINE)  # 移除列表标记
-        clean = re.sub(r'^>\s+', '', clean, flags=re.MULTILINE)  # 移除引用
-        clean = re.sub(r'---+', '', clean)  # 移除分隔线
+        # 各步骤有先后依赖（如 "***x***"、"## - 列表"），不能合并成一次替换；
+        # 文本中没有对应标记字符的步骤直接跳过（分镜片段通常是纯文本）
+        clean = text
+        if '#' in clean:
+            clean = _MD_HEADING_RE.sub('', clean)  # 移除标题标记
+        if '*' in clean:
+            clean = _MD_BOLD_RE.sub(r'\1', clean)  # 移除粗体
+            clean = _MD_ITALIC_RE.sub(r'\1', clean)  # 移除斜体
+        if '](' in clean:
+            clean = _MD_LINK_RE.sub(r'\1', clean)  # 移除链接
+        if '`' in clean:
+            clean = _MD_CODE_BLOCK_RE.sub('', clean)  # 移除代码块
+            clean = _MD_INLINE_CODE_RE.sub(r'\1', clean)  # 移除行内代码
+        if '-' in clean or '*' in clean:
+            clean = _MD_LIST_RE.sub('', clean)  # 移除列表标记
+        if '>' in clean:
+            clean = _MD_QUOTE_RE.sub('', clean)  # 移除引用
+        if '---' in clean:
+            clean = _MD_RULE_RE.sub('', clean)  # 移除分隔线
 
         # 移除表情符号（保留中文标点）
-        clean = re.sub(r'[📊🏛️💰🔧💼✨✓⚠️❌✅]', '', clean)
+        clean = _EMOJI_RE.sub('', clean)
 
         # 清理多余空白
-        clean = re.sub(r'\n{3,}', '\n\n', clean)
+        if '\n\n\n' in clean:
+            clean = _EXTRA_NEWLINES_RE.sub('\n\n', clean)
         clean = clean.strip()
 
         return clean
@@ -143,7 +170,8 @@ class TTSGenerator:
         self,
         segments: List[Dict[str, Any]],
         output_dir: str,
-        voice_id: Optional[str] = None
+        voice_id: Optional[str] = None,
+        max_concurrent: int = 4
     ) -> List[Dict[str, Any]]:
         """
         Generate audio for multiple text segments
@@ -152,28 +180,43 @@ class TTSGenerator:
             segments: List of segment dicts with 'text' key
             output_dir: Directory to save audio files
             voice_id: Optional voice ID
+            max_concurrent: Max concurrent TTS requests
 
         Returns:
             List of segments with 'audio_path' added
         """
         Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-        results = []
-        for i, segment in enumerate(segments):
-            text = segment.get('text', '')
-            if not text.strip():
-                continue
+        jobs = [
+            (i, segment, os.path.join(output_dir, f"segment_{i:03d}.mp3"))
+            for i, segment in enumerate(segments)
+            if segment.get('text', '').strip()
+        ]
+        if not jobs:
+            self.logger.info("Generated 0 audio segments")
+            return []
+
+        # TTS 耗时主要在网络和服务端，多个片段并发请求；结果按原顺序返回
+        generated = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrent, len(jobs)))) as executor:
+            futures = {
+                executor.submit(self.generate_audio, segment['text'], audio_path, voice_id): i
+                for i, segment, audio_path in jobs
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    future.result()
+                    generated[i] = True
+                except Exception as e:
+                    self.logger.error(f"Failed to generate audio for segment {i}: {e}")
 
-            audio_path = os.path.join(output_dir, f"segment_{i:03d}.mp3")
-
-            try:
-                self.generate_audio(text, audio_path, voice_id)
+        results = []
+        for i, segment, audio_path in jobs:
+            if i in generated:
                 segment_result = segment.copy()
                 segment_result['audio_path'] = audio_path
                 results.append(segment_result)
-            except Exception as e:
-                self.logger.error(f"Failed to generate audio for segment {i}: {e}")
-                continue
 
         self.logger.info(f"Generated {len(results)} audio segments")
         return results
@@ -7,6 +7,8 @@ import requests
 import json
 from dotenv import load_dotenv
 
+from src.utils.helpers import loads_json
+
 load_dotenv()
 
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
@@ -18,6 +20,18 @@ print(f"Base URL: {OPENROUTER_BASE_URL}")
 print(f"Model: {GEMINI_IMAGE_MODEL}")
 print("-" * 60)
 
+
+def abbreviate(value, limit=200):
+    """Shorten long strings (base64 image data) for printing"""
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]}... ({len(value)} chars)"
+    if isinstance(value, dict):
+        return {k: abbreviate(v, limit) for k, v in value.items()}
+    if isinstance(value, list):
+        return [abbreviate(v, limit) for v in value]
+    return value
+
+
 headers = {
     "Authorization": f"Bearer {OPENROUTER_API_KEY}",
     "Content-Type": "application/json"
@@ -49,9 +63,10 @@ print("-" * 60)
 if response.status_code != 200:
     print(f"ERROR: {response.text}")
 else:
-    result = response.json()
+    # 响应里的图片是数 MB 的 base64，直接用 orjson 解析原始字节，打印时截断长字符串
+    result = loads_json(response.content)
     print("Response JSON:")
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print(json.dumps(abbreviate(result), indent=2, ensure_ascii=False))
 
     # Check for images
     if 'choices' in result and len(result['choices']) > 0: